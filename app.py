@@ -1,17 +1,24 @@
 # ./app.py
+import bisect
+import hashlib
 import json
+import logging
 import os
+import pickle
+import re
+import subprocess
 import sys
-from datetime import datetime, timezone
-from pathlib import Path
-from typing import Optional
+import tempfile
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date, datetime, time, timezone
+from typing import Any, Optional
 
-import pandas as pd
-import plotly.express as px  # type: ignore
 import streamlit as st
 
 sys.path.append(".")
 
+from src.constants import REPO_MANIFEST_FILENAME, REPORTS_CACHE_DIR
 from src.evaluation import (
     BonusML,
     BonusTechnique,
@@ -23,381 +30,401 @@ from src.evaluation import (
 from src.project_eval import ProjectEvaluator
 from src.repo_stats import RepoReport, RepoStats
 
+# Directories that never hold repositories worth analyzing (hidden ones are skipped too)
+_NON_REPO_DIRS = frozenset({"node_modules", "__pycache__", "venv"})
 
-def find_repositories(base_path: str):
-    """Find all git repositories in the given path"""
-    return [str(path.parent) for path in Path(base_path).rglob(".git")]
-
-
-def render_evaluation_form(
-    evaluator: ProjectEvaluator, current_evaluation: Optional[EvaluationProjet] = None
-) -> bool:
-    """Render the evaluation form in Streamlit."""
-    st.header("📋 Project Evaluation")
-
-    # Initialize with current evaluation or default
-    if current_evaluation is None:
-        current_evaluation = evaluator.create_default_evaluation()
-
-    with st.form("evaluation_form"):
-        st.subheader("🏗️ Structure & Project Design (40 points)")
-
-        # Structure section
-        col1, col2 = st.columns([1, 2])
-        with col1:
-            arch_mod = st.slider(
-                "Architecture Modulaire",
-                0,
-                10,
-                current_evaluation.structure.architecture_modulaire,
-                key="arch_mod",
-            )
-        with col2:
-            arch_mod_comment = st.text_area(
-                "Comment",
-                current_evaluation.structure.architecture_modulaire_comment,
-                key="arch_mod_comment",
-            )
-
-        col1, col2 = st.columns([1, 2])
-        with col1:
-            lisib_code = st.slider(
-                "Lisibilité Code",
-                0,
-                5,
-                current_evaluation.structure.lisibilite_code,
-                key="lisib_code",
-            )
-        with col2:
-            lisib_code_comment = st.text_area(
-                "Comment",
-                current_evaluation.structure.lisibilite_code_comment,
-                key="lisib_code_comment",
-            )
-
-        col1, col2 = st.columns([1, 2])
-        with col1:
-            refactor = st.slider(
-                "Refactorisation",
-                0,
-                5,
-                current_evaluation.structure.refactorisation,
-                key="refactor",
-            )
-        with col2:
-            refactor_comment = st.text_area(
-                "Comment",
-                current_evaluation.structure.refactorisation_comment,
-                key="refactor_comment",
-            )
-
-        col1, col2 = st.columns([1, 2])
-        with col1:
-            tests = st.slider(
-                "Tests Unitaires",
-                0,
-                10,
-                current_evaluation.structure.tests_unitaires,
-                key="tests",
-            )
-        with col2:
-            tests_comment = st.text_area(
-                "Comment",
-                current_evaluation.structure.tests_unitaires_comment,
-                key="tests_comment",
-            )
 
-        col1, col2 = st.columns([1, 2])
-        with col1:
-            env_virt = st.slider(
-                "Environnement Virtuel",
-                0,
-                10,
-                current_evaluation.structure.environnement_virtuel,
-                key="env_virt",
-            )
-        with col2:
-            env_virt_comment = st.text_area(
-                "Comment",
-                current_evaluation.structure.environnement_virtuel_comment,
-                key="env_virt_comment",
-            )
+def _find_repositories_uncached(base_path: str) -> list[str]:
+    """Find all git repositories in the given path"""
+    repositories = []
+    stack = [base_path]
+    while stack:
+        directory = stack.pop()
+        subdirectories = []
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if entry.name == ".git":
+                        # a directory, or a "gitdir:" file for worktrees and
+                        # submodules. Repositories don't nest: stop listing and
+                        # don't descend
+                        repositories.append(directory)
+                        break
+                    # DirEntry caches the d_type: no stat call per entry
+                    if not entry.is_dir(follow_symlinks=False):
+                        continue
+                    if (
+                        not entry.name.startswith(".")
+                        and entry.name not in _NON_REPO_DIRS
+                    ):
+                        subdirectories.append(entry.path)
+                else:
+                    stack.extend(subdirectories)
+        except OSError:
+            continue
+    return repositories
+
+
+def _read_repo_manifest(base_path: str) -> list[str] | None:
+    """Read the repositories listed by download.py, None if there is no manifest"""
+    try:
+        with open(os.path.join(base_path, REPO_MANIFEST_FILENAME)) as f:
+            names = f.read().splitlines()
+    except OSError:
+        return None
+    paths = (os.path.join(base_path, name) for name in names if name)
+    return [path for path in paths if os.path.exists(os.path.join(path, ".git"))]
+
+
+# mtime_ns only changes when top-level entries change: the TTL catches nested ones
+@st.cache_data(ttl=60, show_spinner=False)
+def find_repositories(base_path: str, mtime_ns: int) -> tuple[list[str], list[str]]:
+    """
+    Find all git repositories in the given path (cached, keyed on its mtime).
+
+    Returns:
+        Tuple of (repository paths, repository names), sorted by name
+    """
+    paths = _read_repo_manifest(base_path)
+    if paths is None:
+        paths = _find_repositories_uncached(base_path)
+    names = [os.path.basename(path) for path in paths]
+    order = sorted(range(len(paths)), key=lambda i: names[i].casefold())
+    return [paths[i] for i in order], [names[i] for i in order]
+
+
+def _repo_stats(repo_path: str) -> RepoStats:
+    """Open the repository once and reuse the git handle across reruns"""
+    # Kept per session: git.Repo and RepoStats' memo are not thread-safe, and
+    # each session runs in its own thread. Only the selected repository is kept
+    # open, with its persistent git processes.
+    cached = st.session_state.get("repo_stats")
+    if cached is None or cached[0] != repo_path:
+        cached = (repo_path, RepoStats(repo_path))
+        st.session_state["repo_stats"] = cached
+    return cached[1]
+
+
+def _date_range_bounds(start: date, end: date) -> tuple[datetime, datetime]:
+    """UTC bounds of a range of days: start of the first one, end of the last one"""
+    # git log --until is inclusive and commit dates have a one second resolution
+    return (
+        datetime.combine(start, time.min, tzinfo=timezone.utc),
+        datetime.combine(end, time(23, 59, 59), tzinfo=timezone.utc),
+    )
 
-        st.subheader("🤝 Collaboration & Quality (25 points)")
 
-        col1, col2 = st.columns([1, 2])
-        with col1:
-            git_util = st.slider(
-                "Git Utilisation",
-                0,
-                10,
-                current_evaluation.collaboration.git_utilisation,
-                key="git_util",
-            )
-        with col2:
-            git_util_comment = st.text_area(
-                "Comment",
-                current_evaluation.collaboration.git_utilisation_comment,
-                key="git_util_comment",
+def _repo_head(repo_path: str) -> str | None:
+    """Return the repository HEAD sha, None if it has no commit"""
+    try:
+        return (
+            subprocess.check_output(
+                ["git", "-C", repo_path, "rev-parse", "HEAD"],
+                stderr=subprocess.DEVNULL,
             )
+            .decode()
+            .strip()
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _generate_report(
+    repo_path: str,
+    start_iso: str,
+    end_iso: str,
+    max_depth: int,
+    exclude_patterns: tuple[re.Pattern[str], ...],
+) -> RepoReport:
+    """Generate the repository report"""
+    return _repo_stats(repo_path).generate_report(
+        start_date=datetime.fromisoformat(start_iso),
+        end_date=datetime.fromisoformat(end_iso),
+        max_depth=max_depth,
+        exclude_patterns=list(exclude_patterns),
+    )
 
-        col1, col2 = st.columns([1, 2])
-        with col1:
-            repartition = st.slider(
-                "Répartition Tâches",
-                0,
-                15,
-                current_evaluation.collaboration.repartition_taches,
-                key="repartition",
-            )
-        with col2:
-            repartition_comment = st.text_area(
-                "Comment",
-                current_evaluation.collaboration.repartition_taches_comment,
-                key="repartition_comment",
-            )
 
-        st.subheader("📚 Documentation & Deliverables (35 points)")
+# Bump whenever RepoReport changes shape, to invalidate reports cached on disk
+REPORT_CACHE_VERSION = 4
 
-        col1, col2 = st.columns([1, 2])
-        with col1:
-            readme = st.slider(
-                "README", 0, 10, current_evaluation.documentation.readme, key="readme"
-            )
-        with col2:
-            readme_comment = st.text_area(
-                "Comment",
-                current_evaluation.documentation.readme_comment,
-                key="readme_comment",
-            )
 
-        col1, col2 = st.columns([1, 2])
-        with col1:
-            code_comment = st.slider(
-                "Code Commenté",
-                0,
-                5,
-                current_evaluation.documentation.code_commente,
-                key="code_comment",
-            )
-        with col2:
-            code_comment_comment = st.text_area(
-                "Comment",
-                current_evaluation.documentation.code_commente_comment,
-                key="code_comment_comment",
-            )
-
-        col1, col2 = st.columns([1, 2])
-        with col1:
-            guide_util = st.slider(
-                "Guide Utilisation",
-                0,
-                5,
-                current_evaluation.documentation.guide_utilisation,
-                key="guide_util",
-            )
-        with col2:
-            guide_util_comment = st.text_area(
-                "Comment",
-                current_evaluation.documentation.guide_utilisation_comment,
-                key="guide_util_comment",
-            )
-
-        col1, col2 = st.columns([1, 2])
-        with col1:
-            livrables = st.slider(
-                "Livrables Propres",
-                0,
-                5,
-                current_evaluation.documentation.livrables_propres,
-                key="livrables",
-            )
-        with col2:
-            livrables_comment = st.text_area(
-                "Comment",
-                current_evaluation.documentation.livrables_propres_comment,
-                key="livrables_comment",
-            )
+def _cached_report(
+    repo_path: str,
+    head: str | None,
+    start_iso: str,
+    end_iso: str,
+    max_depth: int,
+    exclude_patterns: tuple[re.Pattern[str], ...],
+) -> RepoReport:
+    """Load the report from the disk cache, keyed by repo HEAD sha and parameters"""
+    if head is None:
+        # no HEAD to key on (e.g. repository without commits): don't persist
+        return _generate_report(
+            repo_path, start_iso, end_iso, max_depth, exclude_patterns
+        )
 
-        col1, col2 = st.columns([1, 2])
-        with col1:
-            prompt_eng = st.slider(
-                "Prompt Engineering",
-                0,
-                10,
-                current_evaluation.documentation.prompt_engineering,
-                key="prompt_eng",
-            )
-        with col2:
-            prompt_eng_comment = st.text_area(
-                "Comment",
-                current_evaluation.documentation.prompt_engineering_comment,
-                key="prompt_eng_comment",
-            )
+    params = (
+        REPORT_CACHE_VERSION,
+        os.path.abspath(repo_path),
+        head,
+        start_iso,
+        end_iso,
+        max_depth,
+        # repr() of a Pattern is truncated: key on its full source and flags
+        tuple((pattern.pattern, pattern.flags) for pattern in exclude_patterns),
+    )
+    key = hashlib.sha1(repr(params).encode()).hexdigest()
+    # the name keeps files readable, the path hash tells same-name repos apart
+    repo_abspath = os.path.abspath(repo_path)
+    repo_id = "{}-{}".format(
+        os.path.basename(repo_abspath),
+        hashlib.sha1(repo_abspath.encode()).hexdigest()[:12],
+    )
+    cache_file = REPORTS_CACHE_DIR / f"{repo_id}-{head}-{key}.pkl"
 
-        st.subheader("🤖 Bonus ML (5 points)")
+    if cache_file.exists():
+        try:
+            return pickle.loads(cache_file.read_bytes())
+        except Exception as e:
+            logging.warning("Ignoring unreadable report cache %s: %s", cache_file, e)
 
-        col1, col2 = st.columns([1, 2])
-        with col1:
-            choix_modele = st.slider(
-                "Choix Modèle",
-                0,
-                1,
-                current_evaluation.bonus_ml.choix_modele,
-                key="choix_modele",
-            )
-        with col2:
-            choix_modele_comment = st.text_area(
-                "Comment",
-                current_evaluation.bonus_ml.choix_modele_comment,
-                key="choix_modele_comment",
-            )
+    report = _generate_report(
+        repo_path, start_iso, end_iso, max_depth, exclude_patterns
+    )
+    # The cache is only an optimization: failing to write it is not an error
+    tmp_name = None
+    try:
+        REPORTS_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        # unique temporary name: sessions may write the same report at once
+        with tempfile.NamedTemporaryFile(
+            dir=REPORTS_CACHE_DIR, suffix=".tmp", delete=False
+        ) as tmp_file:
+            tmp_name = tmp_file.name
+            pickle.dump(report, tmp_file, protocol=5)
+        os.replace(tmp_name, cache_file)
+    except OSError as e:
+        logging.warning("Could not write report cache %s: %s", cache_file, e)
+        if tmp_name is not None:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+    else:
+        _prune_report_cache(repo_id, head)
+    return report
 
-        col1, col2 = st.columns([1, 2])
-        with col1:
-            pretraitement = st.slider(
-                "Prétraitement",
-                0,
-                1,
-                current_evaluation.bonus_ml.pretraitement,
-                key="pretraitement",
-            )
-        with col2:
-            pretraitement_comment = st.text_area(
-                "Comment",
-                current_evaluation.bonus_ml.pretraitement_comment,
-                key="pretraitement_comment",
-            )
 
-        col1, col2 = st.columns([1, 2])
-        with col1:
-            eval_modele = st.slider(
-                "Évaluation Modèle",
-                0,
-                1,
-                current_evaluation.bonus_ml.evaluation_modele,
-                key="eval_modele",
-            )
-        with col2:
-            eval_modele_comment = st.text_area(
-                "Comment",
-                current_evaluation.bonus_ml.evaluation_modele_comment,
-                key="eval_modele_comment",
-            )
+def _prune_report_cache(repo_id: str, head: str) -> None:
+    """Delete the cached reports of the repository's previous HEADs"""
+    cache_file_re = re.compile(
+        rf"{re.escape(repo_id)}-(?P<head>[0-9a-f]+)-[0-9a-f]{{40}}\.pkl"
+    )
+    try:
+        with os.scandir(REPORTS_CACHE_DIR) as entries:
+            stale = [
+                entry.path
+                for entry in entries
+                if (match := cache_file_re.fullmatch(entry.name))
+                and match["head"] != head
+            ]
+    except OSError:
+        # e.g. the cache directory was removed meanwhile: nothing to prune
+        return
+    for path in stale:
+        try:
+            os.unlink(path)
+        except OSError:
+            # e.g. already pruned by another session
+            pass
+
+
+@st.cache_data(ttl=3600, show_spinner="Analyzing repository...")
+def _analyze(
+    repo_path: str,
+    head: str | None,
+    start_iso: str,
+    end_iso: str,
+    max_depth: int,
+    exclude_patterns: tuple[re.Pattern[str], ...],
+) -> RepoReport:
+    """Generate the repository report (cached on its inputs and the repo HEAD)"""
+    return _cached_report(
+        repo_path, head, start_iso, end_iso, max_depth, exclude_patterns
+    )
 
-        col1, col2 = st.columns([1, 2])
-        with col1:
-            analyse_crit = st.slider(
-                "Analyse Critique",
-                0,
-                1,
-                current_evaluation.bonus_ml.analyse_critique,
-                key="analyse_crit",
-            )
-        with col2:
-            analyse_crit_comment = st.text_area(
-                "Comment",
-                current_evaluation.bonus_ml.analyse_critique_comment,
-                key="analyse_crit_comment",
-            )
 
-        col1, col2 = st.columns([1, 2])
-        with col1:
-            shap_avance = st.slider(
-                "SHAP Avancé",
-                0,
-                1,
-                current_evaluation.bonus_ml.shap_avance,
-                key="shap_avance",
-            )
-        with col2:
-            shap_avance_comment = st.text_area(
-                "Comment",
-                current_evaluation.bonus_ml.shap_avance_comment,
-                key="shap_avance_comment",
-            )
+@st.cache_data(show_spinner=False)
+def _build_file_types_fig(file_types: tuple[tuple[str, int], ...]) -> dict:
+    """Build the file type distribution chart from (extension, count) records"""
+    import pandas as pd
+    import plotly.express as px  # type: ignore
 
-        st.subheader("⚙️ Bonus Technique (5 points)")
+    file_df = pd.DataFrame(file_types, columns=["Type", "Count"]).sort_values(
+        "Count", ascending=False
+    )
+    return px.pie(
+        file_df,
+        values="Count",
+        names="Type",
+        title="File Type Distribution",
+        hole=0.4,
+    ).to_plotly_json()
+
+
+@st.cache_data(show_spinner=False)
+def _build_score_breakdown_fig(breakdown: tuple[tuple[str, int, int], ...]) -> dict:
+    """Build the score breakdown chart from (category, score, max) records"""
+    import pandas as pd
+    import plotly.express as px  # type: ignore
+
+    df = pd.DataFrame(breakdown, columns=["Category", "Score", "Max"])
+    df["Percentage"] = (df["Score"] / df["Max"] * 100).round(1)
 
-        col1, col2 = st.columns([1, 2])
-        with col1:
-            pipeline_ml = st.slider(
-                "Pipeline ML",
-                0,
-                1,
-                current_evaluation.bonus_tech.pipeline_ml,
-                key="pipeline_ml",
-            )
-        with col2:
-            pipeline_ml_comment = st.text_area(
-                "Comment",
-                current_evaluation.bonus_tech.pipeline_ml_comment,
-                key="pipeline_ml_comment",
-            )
+    fig = px.bar(
+        df,
+        x="Category",
+        y="Score",
+        text="Score",
+        title="Score Breakdown by Category",
+        color="Percentage",
+        color_continuous_scale="RdYlGn",
+    )
+    fig.update_traces(texttemplate="%{text}", textposition="outside")
+    fig.update_layout(showlegend=False)
+    return fig.to_plotly_json()
+
+
+@st.cache_data(show_spinner=False)
+def _build_activity_fig(activity: tuple[tuple[datetime, int], ...]) -> dict:
+    """Build the commit activity chart from (day, commits) records"""
+    import pandas as pd
+    import plotly.express as px  # type: ignore
+
+    activity_df = pd.DataFrame(activity, columns=["date_only", "commits"])
+    return px.bar(
+        activity_df,
+        x="date_only",
+        y="commits",
+        title="Commit Activity",
+        labels={"date_only": "Date", "commits": "Commits"},
+    ).to_plotly_json()
+
+
+@st.cache_data(show_spinner=False)
+def _build_contributors_fig(authors: tuple[tuple[str, int], ...]) -> dict:
+    """Build the top contributors chart from (author, commits) records"""
+    import pandas as pd
+    import plotly.express as px  # type: ignore
+
+    author_df = pd.DataFrame(authors, columns=["author", "count"])
+    return px.bar(
+        author_df,
+        x="author",
+        y="count",
+        title="Top Contributors",
+        labels={"author": "Author", "count": "Number of Commits"},
+    ).to_plotly_json()
+
+
+@st.cache_resource
+def _saver_pool() -> ThreadPoolExecutor:
+    """Thread pool writing evaluation files off the UI thread"""
+    return ThreadPoolExecutor(max_workers=2)
+
+
+def _check_pending_saves() -> None:
+    """Report background evaluation saves, keeping the unfinished ones"""
+    pending: list[Future[bool]] = st.session_state.pop("pending_saves", [])
+    unfinished = [future for future in pending if not future.done()]
+    for future in pending:
+        if not future.done():
+            continue
+        try:
+            saved = future.result()
+        except Exception as e:
+            st.error(f"❌ Failed to save evaluation: {e}")
+        else:
+            if saved:
+                st.success("✅ Evaluation saved")
+            else:
+                st.error("❌ Failed to save evaluation")
+    if unfinished:
+        # Checked again on the next run, without blocking this one
+        st.session_state["pending_saves"] = unfinished
+        st.info("⏳ Saving evaluation...")
+
+
+# Form layout: section key -> subheader
+EVALUATION_SECTIONS = {
+    "structure": "🏗️ Structure & Project Design (40 points)",
+    "collaboration": "🤝 Collaboration & Quality (25 points)",
+    "documentation": "📚 Documentation & Deliverables (35 points)",
+    "bonus_ml": "🤖 Bonus ML (5 points)",
+    "bonus_tech": "⚙️ Bonus Technique (5 points)",
+}
+
+# Form fields: (section key, field name, label, max score)
+EVALUATION_FIELDS = (
+    ("structure", "architecture_modulaire", "Architecture Modulaire", 10),
+    ("structure", "lisibilite_code", "Lisibilité Code", 5),
+    ("structure", "refactorisation", "Refactorisation", 5),
+    ("structure", "tests_unitaires", "Tests Unitaires", 10),
+    ("structure", "environnement_virtuel", "Environnement Virtuel", 10),
+    ("collaboration", "git_utilisation", "Git Utilisation", 10),
+    ("collaboration", "repartition_taches", "Répartition Tâches", 15),
+    ("documentation", "readme", "README", 10),
+    ("documentation", "code_commente", "Code Commenté", 5),
+    ("documentation", "guide_utilisation", "Guide Utilisation", 5),
+    ("documentation", "livrables_propres", "Livrables Propres", 5),
+    ("documentation", "prompt_engineering", "Prompt Engineering", 10),
+    ("bonus_ml", "choix_modele", "Choix Modèle", 1),
+    ("bonus_ml", "pretraitement", "Prétraitement", 1),
+    ("bonus_ml", "evaluation_modele", "Évaluation Modèle", 1),
+    ("bonus_ml", "analyse_critique", "Analyse Critique", 1),
+    ("bonus_ml", "shap_avance", "SHAP Avancé", 1),
+    ("bonus_tech", "pipeline_ml", "Pipeline ML", 1),
+    ("bonus_tech", "shap_integre", "SHAP Intégré", 1),
+    ("bonus_tech", "interface_fonctionnelle", "Interface Fonctionnelle", 1),
+    ("bonus_tech", "complexite", "Complexité", 1),
+    ("bonus_tech", "dependances", "Dépendances", 1),
+)
 
-        col1, col2 = st.columns([1, 2])
-        with col1:
-            shap_integre = st.slider(
-                "SHAP Intégré",
-                0,
-                1,
-                current_evaluation.bonus_tech.shap_integre,
-                key="shap_integre",
-            )
-        with col2:
-            shap_integre_comment = st.text_area(
-                "Comment",
-                current_evaluation.bonus_tech.shap_integre_comment,
-                key="shap_integre_comment",
-            )
 
-        col1, col2 = st.columns([1, 2])
-        with col1:
-            interface_fonc = st.slider(
-                "Interface Fonctionnelle",
-                0,
-                1,
-                current_evaluation.bonus_tech.interface_fonctionnelle,
-                key="interface_fonc",
-            )
-        with col2:
-            interface_fonc_comment = st.text_area(
-                "Comment",
-                current_evaluation.bonus_tech.interface_fonctionnelle_comment,
-                key="interface_fonc_comment",
-            )
+@st.fragment
+def render_evaluation_form(
+    evaluator: ProjectEvaluator, current_evaluation: Optional[EvaluationProjet] = None
+) -> bool:
+    """Render the evaluation form in Streamlit."""
+    st.header("📋 Project Evaluation")
 
-        col1, col2 = st.columns([1, 2])
-        with col1:
-            complexite = st.slider(
-                "Complexité",
-                0,
-                1,
-                current_evaluation.bonus_tech.complexite,
-                key="complexite",
-            )
-        with col2:
-            complexite_comment = st.text_area(
-                "Comment",
-                current_evaluation.bonus_tech.complexite_comment,
-                key="complexite_comment",
-            )
+    # Initialize with current evaluation or default
+    if current_evaluation is None:
+        current_evaluation = evaluator.create_default_evaluation()
 
-        col1, col2 = st.columns([1, 2])
-        with col1:
-            dependances = st.slider(
-                "Dépendances",
-                0,
-                1,
-                current_evaluation.bonus_tech.dependances,
-                key="dependances",
-            )
-        with col2:
-            dependances_comment = st.text_area(
-                "Comment",
-                current_evaluation.bonus_tech.dependances_comment,
-                key="dependances_comment",
-            )
+    with st.form("evaluation_form"):
+        results: dict[str, dict[str, Any]] = {key: {} for key in EVALUATION_SECTIONS}
+
+        for section, field, label, max_value in EVALUATION_FIELDS:
+            if not results[section]:
+                st.subheader(EVALUATION_SECTIONS[section])
+
+            current_section = getattr(current_evaluation, section)
+            col1, col2 = st.columns([1, 2])
+            with col1:
+                results[section][field] = st.slider(
+                    label,
+                    0,
+                    max_value,
+                    getattr(current_section, field),
+                    key=field,
+                )
+            with col2:
+                results[section][f"{field}_comment"] = st.text_area(
+                    "Comment",
+                    getattr(current_section, f"{field}_comment"),
+                    key=f"{field}_comment",
+                )
 
         # Submit button
         submitted = st.form_submit_button("💾 Save Evaluation", type="primary")
@@ -405,73 +432,33 @@ def render_evaluation_form(
         if submitted:
             # Create evaluation object
             new_evaluation = EvaluationProjet(
-                structure=StructureProjetDesign(
-                    architecture_modulaire=arch_mod,
-                    architecture_modulaire_comment=arch_mod_comment,
-                    lisibilite_code=lisib_code,
-                    lisibilite_code_comment=lisib_code_comment,
-                    refactorisation=refactor,
-                    refactorisation_comment=refactor_comment,
-                    tests_unitaires=tests,
-                    tests_unitaires_comment=tests_comment,
-                    environnement_virtuel=env_virt,
-                    environnement_virtuel_comment=env_virt_comment,
-                ),
-                collaboration=CollaborationQualite(
-                    git_utilisation=git_util,
-                    git_utilisation_comment=git_util_comment,
-                    repartition_taches=repartition,
-                    repartition_taches_comment=repartition_comment,
-                ),
-                documentation=DocumentationLivrables(
-                    readme=readme,
-                    readme_comment=readme_comment,
-                    code_commente=code_comment,
-                    code_commente_comment=code_comment_comment,
-                    guide_utilisation=guide_util,
-                    guide_utilisation_comment=guide_util_comment,
-                    livrables_propres=livrables,
-                    livrables_propres_comment=livrables_comment,
-                    prompt_engineering=prompt_eng,
-                    prompt_engineering_comment=prompt_eng_comment,
-                ),
-                bonus_ml=BonusML(
-                    choix_modele=choix_modele,
-                    choix_modele_comment=choix_modele_comment,
-                    pretraitement=pretraitement,
-                    pretraitement_comment=pretraitement_comment,
-                    evaluation_modele=eval_modele,
-                    evaluation_modele_comment=eval_modele_comment,
-                    analyse_critique=analyse_crit,
-                    analyse_critique_comment=analyse_crit_comment,
-                    shap_avance=shap_avance,
-                    shap_avance_comment=shap_avance_comment,
-                ),
-                bonus_tech=BonusTechnique(
-                    pipeline_ml=pipeline_ml,
-                    pipeline_ml_comment=pipeline_ml_comment,
-                    shap_integre=shap_integre,
-                    shap_integre_comment=shap_integre_comment,
-                    interface_fonctionnelle=interface_fonc,
-                    interface_fonctionnelle_comment=interface_fonc_comment,
-                    complexite=complexite,
-                    complexite_comment=complexite_comment,
-                    dependances=dependances,
-                    dependances_comment=dependances_comment,
-                ),
+                structure=StructureProjetDesign(**results["structure"]),
+                collaboration=CollaborationQualite(**results["collaboration"]),
+                documentation=DocumentationLivrables(**results["documentation"]),
+                bonus_ml=BonusML(**results["bonus_ml"]),
+                bonus_tech=BonusTechnique(**results["bonus_tech"]),
             )
 
-            # Save evaluation
+            # Save evaluation in the background, checked on the next run
             print(f"***########Saving evaluation: {new_evaluation}")
-            if evaluator.save_evaluation(new_evaluation):
-                st.success("✅ Evaluation saved successfully!")
-                st.rerun()
-            else:
-                st.error("❌ Failed to save evaluation")
+            future = _saver_pool().submit(evaluator.save_evaluation, new_evaluation)
+            st.session_state.setdefault("pending_saves", []).append(future)
+            st.rerun()
 
     return submitted
 
 
+# Number of rows added to the commit table per "Load more"
+COMMIT_TABLE_PAGE_SIZE = 200
+
+# Maximum number of raw JSON characters displayed in the file structure view
+RAW_JSON_PREVIEW_CHARS = 100_000
+
+# Letter grades: minimum percentage for each grade above "F"
+_GRADE_CUTS = (60, 70, 80, 90)
+_GRADES = ("F", "D", "C", "B", "A")
+
+
 def render_evaluation_display(
     evaluator: ProjectEvaluator, evaluation: EvaluationProjet
 ):
@@ -498,65 +485,170 @@ def render_evaluation_display(
         st.metric("Final Score", f"{scores['final_score']}/{scores['final_max']}")
 
     with col4:
-        grade = (
-            "A"
-            if scores["percentage"] >= 90
-            else "B"
-            if scores["percentage"] >= 80
-            else "C"
-            if scores["percentage"] >= 70
-            else "D"
-            if scores["percentage"] >= 60
-            else "F"
-        )
+        grade = _GRADES[bisect.bisect_right(_GRADE_CUTS, scores["percentage"])]
         st.metric("Grade", grade)
 
-    # Score breakdown chart
-    breakdown_data = {
-        "Category": [
-            "Structure\n& Design",
-            "Collaboration",
-            "Documentation",
-            "ML Bonus",
-            "Tech Bonus",
-        ],
-        "Score": [
-            scores["structure_score"],
-            scores["collaboration_score"],
-            scores["documentation_score"],
-            scores["bonus_ml_score"],
-            scores["bonus_tech_score"],
-        ],
-        "Max": [
-            scores["structure_max"],
-            scores["collaboration_max"],
-            scores["documentation_max"],
-            scores["bonus_ml_max"],
-            scores["bonus_tech_max"],
-        ],
-    }
-
-    df = pd.DataFrame(breakdown_data)
-    df["Percentage"] = (df["Score"] / df["Max"] * 100).round(1)
-
-    fig = px.bar(
-        df,
-        x="Category",
-        y="Score",
-        text="Score",
-        title="Score Breakdown by Category",
-        color="Percentage",
-        color_continuous_scale="RdYlGn",
+    # Score breakdown chart: (category, score, max) records
+    breakdown = (
+        ("Structure\n& Design", scores["structure_score"], scores["structure_max"]),
+        ("Collaboration", scores["collaboration_score"], scores["collaboration_max"]),
+        ("Documentation", scores["documentation_score"], scores["documentation_max"]),
+        ("ML Bonus", scores["bonus_ml_score"], scores["bonus_ml_max"]),
+        ("Tech Bonus", scores["bonus_tech_score"], scores["bonus_tech_max"]),
+    )
+    st.plotly_chart(
+        _build_score_breakdown_fig(breakdown),
+        key="score_breakdown",
+        use_container_width=True,
     )
-    fig.update_traces(texttemplate="%{text}", textposition="outside")
-    fig.update_layout(showlegend=False)
-    st.plotly_chart(fig, use_container_width=True)
 
     # Display summary
     summary = evaluator.get_evaluation_summary(evaluation)
     st.markdown(summary)
 
 
+def render_repository_stats(report: RepoReport) -> None:
+    """Display basic and file statistics of the repository."""
+    col1, col2, col3 = st.columns([0.75, 0.75, 1.5])
+
+    with col1:
+        st.header("Basic Statistics")
+        st.metric("Total Commits", report.basic_stats.total_commits)
+        st.metric("Active Branches", report.basic_stats.active_branches)
+        st.metric("Contributors", report.basic_stats.contributors)
+        st.metric(
+            "Last Commit",
+            report.basic_stats.last_commit.strftime("%Y-%m-%d %H:%M"),
+        )
+
+    with col2:
+        st.header("File Statistics")
+
+        # Total files and lines
+        st.metric("Total Files", report.file_stats.total_files)
+        st.metric("Total Lines", report.file_stats.total_lines)
+        st.metric("Repository Size", f"{report.basic_stats.repo_size_mb} MB")
+
+    with col3:
+        # File type distribution
+        file_types = report.file_stats.file_types
+        if file_types:
+            st.plotly_chart(
+                _build_file_types_fig(tuple(sorted(file_types.items()))),
+                key=f"file_types_{report.repository}",
+            )
+
+
+def render_file_structure(report: RepoReport) -> None:
+    """Display the repository file structure, as a tree or raw JSON."""
+    st.header("File Structure")
+
+    file_structure = report.file_structure
+    formated_tree: list[str] = file_structure.structure_formated
+
+    # Create tabs for different views
+    tab1_fs, tab2_fs = st.tabs(["Tree View", "Raw JSON"])
+
+    with tab1_fs:
+        if formated_tree:
+            st.code("\n".join(formated_tree), language="")
+        else:
+            st.info("No files found or all files were excluded")
+
+    with tab2_fs:
+        # only ship the (possibly large) JSON when asked for
+        if st.button("Load raw JSON", key=f"raw_json_{report.repository}"):
+            structure_raw_json: str = file_structure.structure_raw_json
+            st.download_button(
+                "Download",
+                structure_raw_json,
+                file_name="structure.json",
+                mime="application/json",
+            )
+            st.code(
+                structure_raw_json[:RAW_JSON_PREVIEW_CHARS],
+                language="json",
+            )
+            if len(structure_raw_json) > RAW_JSON_PREVIEW_CHARS:
+                st.caption(
+                    "Preview truncated, download the file for the full structure"
+                )
+
+    # Show exclusion information
+    if report.file_structure.excluded_patterns:
+        st.caption(
+            f"Excluded patterns: {', '.join(report.file_structure.excluded_patterns)}"
+        )
+    if report.file_structure.max_depth is not None:
+        st.caption(f"Maximum depth: {report.file_structure.max_depth}")
+
+
+def render_recent_activity(
+    report: RepoReport, start_date: datetime, end_date: datetime
+) -> None:
+    """Display commit activity charts and the recent commits table."""
+    # deferred: only the analysis tab needs pandas
+    import pandas as pd
+
+    st.header("Recent Activity")
+
+    if len(report.commit_history) == 0:
+        st.info(f"No commits found")
+    else:
+        commit_df = pd.DataFrame(report.commit_history_columns, copy=False)
+        commit_df["date"] = commit_df["date"].dt.tz_localize("UTC")
+
+        commit_df["author"] = (
+            commit_df["author_name"].str.cat(
+                commit_df["author_email"].to_numpy(), sep=" <"
+            )
+            + ">"
+        )
+
+        # Commit activity chart, over the complete date range:
+        # truncate the (naive UTC) commit dates to days in numpy
+        commit_days = report.commit_history_columns["date"].astype("datetime64[D]")
+        date_range = pd.date_range(
+            start=start_date.date(), end=end_date.date(), freq="D"
+        )
+        commits_per_day = (
+            pd.Series(commit_days).value_counts().reindex(date_range, fill_value=0)
+        )
+
+        chart_key = f"{report.repository}_{start_date:%Y%m%d}_{end_date:%Y%m%d}"
+        st.plotly_chart(
+            _build_activity_fig(
+                tuple(zip(commits_per_day.index, commits_per_day.tolist()))
+            ),
+            key=f"activity_{chart_key}",
+        )
+
+        # Author activity chart: top 10 authors by commit count
+        top_contributors = Counter(commit_df["author"]).most_common(10)
+
+        st.plotly_chart(
+            _build_contributors_fig(tuple(top_contributors)),
+            key=f"contributors_{chart_key}",
+        )
+
+        # Commit table, most recent first, paged in on demand
+        st.subheader("Recent Commits")
+        rows_key = f"commit_rows_{report.repository}"
+        n_rows = st.session_state.get(rows_key, COMMIT_TABLE_PAGE_SIZE)
+        recent_commits = commit_df.nlargest(n_rows, "date").loc[
+            :, ["date", "author", "message", "files_changed"]
+        ]
+        recent_commits.columns = pd.Index(
+            ["Date", "Author", "Message", "Files Changed"]
+        )
+        st.dataframe(recent_commits, use_container_width=True, height=400)
+        if n_rows < len(commit_df):
+            st.caption(f"Showing {n_rows} of {len(commit_df)} commits")
+            if st.button("Load more", key=f"load_more_{rows_key}"):
+                st.session_state[rows_key] = n_rows + COMMIT_TABLE_PAGE_SIZE
+                st.rerun()
+
+
 def main() -> None:
     query_params = st.query_params
     repo_from_url = query_params.get("repo", None)
@@ -574,6 +666,9 @@ def main() -> None:
     # Application title
     st.title("Git Repository Analyzer")
 
+    # Surface the outcome of evaluations saved on the previous run
+    _check_pending_saves()
+
     # Sidebar for repository selection
     st.sidebar.header("Repository Selection")
 
@@ -586,13 +681,9 @@ def main() -> None:
 
     # Find repositories
     if os.path.exists(repo_base_path):
-        repo_paths = sorted(
-            find_repositories(repo_base_path), key=lambda x: Path(x).name
-        )
+        mtime_ns = os.stat(repo_base_path).st_mtime_ns
+        repo_paths, repo_names = find_repositories(repo_base_path, mtime_ns)
         if repo_paths:
-            # Get repo names
-            repo_names = [Path(path).name for path in repo_paths]
-
             # Determine selected index from URL
             selected_repo_index = 0
             if repo_from_url is not None:
@@ -631,9 +722,14 @@ def main() -> None:
                 value=".DS_Store\n__pycache__\n.pytest_cache\n.venv\nnode_modules",
                 help="Regular expressions for paths to exclude, one per line",
             )
-            exclude_patterns = [
-                p.strip() for p in exclude_patterns_input.split("\n") if p.strip()
-            ]
+            exclude_patterns: list[re.Pattern[str]] = []
+            for pattern in exclude_patterns_input.split("\n"):
+                if not pattern.strip():
+                    continue
+                try:
+                    exclude_patterns.append(re.compile(pattern.strip()))
+                except re.error as e:
+                    st.sidebar.error(f"Ignoring invalid pattern '{pattern}': {e}")
 
             st.sidebar.header("Date Range Options")
 
@@ -642,214 +738,38 @@ def main() -> None:
             )
             end_date = st.sidebar.date_input("End Date", value=end_date_default.date())
 
-            # Convert back to datetime with the default time
-            start_date = datetime.combine(start_date, datetime.min.time()).replace(
-                tzinfo=timezone.utc
-            )
-            end_date = datetime.combine(end_date, datetime.min.time()).replace(
-                tzinfo=timezone.utc
-            )
+            # Convert back to datetime, covering both days entirely
+            start_date, end_date = _date_range_bounds(start_date, end_date)
 
-            # Display selected date range with better styling
-            st.markdown(
-                f"""
-                <div style="padding: 10px; background-color: #f0f2f6; color:black; border-radius: 10px; text-align: center;">
-                    <b>Date Range:</b> {start_date.strftime("%Y-%m-%d (%H:%M)")} → {end_date.strftime("%Y-%m-%d (%H:%M)")}
-                </div>
-                """,
-                unsafe_allow_html=True,
+            # Display selected date range
+            st.info(
+                f"**Date Range:** {start_date:%Y-%m-%d (%H:%M)} → {end_date:%Y-%m-%d (%H:%M)}"
             )
 
             # Analyze selected repository
             selected_repo_path = repo_paths[selected_repo_index]
 
-            with st.spinner(
-                f"Analyzing repository: {repo_names[selected_repo_index]}..."
-            ):
-                repo_stats = RepoStats(selected_repo_path)
-                report: RepoReport = repo_stats.generate_report(
-                    start_date=start_date,
-                    end_date=end_date,
-                    max_depth=max_depth,
-                    exclude_patterns=exclude_patterns,
-                )
-
-            # Display repository link with a nice button
-            st.markdown(
-                f"""
-                <div style="text-align: center; margin-top: 10px;">
-                    <a href="{report.repository_url}" target="_blank" style="
-                        background-color: #0078ff; 
-                        color: white; 
-                        padding: 10px 20px; 
-                        border-radius: 5px; 
-                        text-decoration: none; 
-                        font-size: 16px;
-                    ">Repository : {report.repository}</a>
-                </div>
-                """,
-                unsafe_allow_html=True,
+            report: RepoReport = _analyze(
+                selected_repo_path,
+                _repo_head(selected_repo_path),
+                start_date.isoformat(),
+                end_date.isoformat(),
+                max_depth,
+                tuple(exclude_patterns),
             )
 
+            # Display repository link as a button
+            st.link_button(f"Repository : {report.repository}", report.repository_url)
+
             # Create tabs for different views
             tab1, tab2 = st.tabs(["📊 Repository Analysis", "📋 Project Evaluation"])
 
             with tab1:
                 try:
-                    # Display repository statistics
-                    col1, col2, col3 = st.columns([0.75, 0.75, 1.5])
-
-                    with col1:
-                        st.header("Basic Statistics")
-                        st.metric("Total Commits", report.basic_stats.total_commits)
-                        st.metric("Active Branches", report.basic_stats.active_branches)
-                        st.metric("Contributors", report.basic_stats.contributors)
-                        st.metric(
-                            "Last Commit",
-                            report.basic_stats.last_commit.strftime("%Y-%m-%d %H:%M"),
-                        )
-
-                    with col2:
-                        st.header("File Statistics")
-
-                        # Total files and lines
-                        st.metric("Total Files", report.file_stats.total_files)
-                        st.metric("Total Lines", report.file_stats.total_lines)
-                        st.metric(
-                            "Repository Size", f"{report.basic_stats.repo_size_mb} MB"
-                        )
-
-                    with col3:
-                        # File type distribution
-                        file_types = report.file_stats.file_types
-                        if file_types:
-                            file_df = pd.DataFrame(
-                                {
-                                    "Type": list(file_types.keys()),
-                                    "Count": list(file_types.values()),
-                                }
-                            ).sort_values("Count", ascending=False)
-
-                            fig = px.pie(
-                                file_df,
-                                values="Count",
-                                names="Type",
-                                title="File Type Distribution",
-                                hole=0.4,
-                            )
-                            st.plotly_chart(fig)
-
+                    render_repository_stats(report)
                     if show_file_structure:
-                        st.header("File Structure")
-
-                        structure_raw_json: str = (
-                            report.file_structure.structure_raw_json
-                        )
-                        formated_tree: list[str] = (
-                            report.file_structure.structure_formated
-                        )
-
-                        # Create tabs for different views
-                        tab1_fs, tab2_fs = st.tabs(["Tree View", "Raw JSON"])
-
-                        with tab1_fs:
-                            if formated_tree:
-                                st.code("\n".join(formated_tree), language="")
-                            else:
-                                st.info("No files found or all files were excluded")
-
-                        with tab2_fs:
-                            st.code(
-                                structure_raw_json,
-                                language="json",
-                            )
-
-                        # Show exclusion information
-                        if report.file_structure.excluded_patterns:
-                            st.caption(
-                                f"Excluded patterns: {', '.join(report.file_structure.excluded_patterns)}"
-                            )
-                        if report.file_structure.max_depth is not None:
-                            st.caption(
-                                f"Maximum depth: {report.file_structure.max_depth}"
-                            )
-
-                    # Recent activity
-                    st.header("Recent Activity")
-
-                    if len(report.commit_history) == 0:
-                        st.info(f"No commits found")
-                    else:
-                        commit_df = pd.DataFrame(
-                            [c.__dict__ for c in report.commit_history]
-                        )
-                        commit_df["date_only"] = pd.to_datetime(
-                            commit_df["date"], utc=True
-                        ).dt.date
-
-                        commit_df["author"] = (
-                            commit_df["author_name"]
-                            + " <"
-                            + commit_df["author_email"]
-                            + ">"
-                        )
-
-                        # Commit activity chart
-                        activity_df = (
-                            commit_df.groupby("date_only")
-                            .size()
-                            .reset_index(name="commits")
-                        )
-                        activity_df["date_only"] = pd.to_datetime(
-                            activity_df["date_only"]
-                        )
-
-                        # Create a complete date range
-                        date_range = pd.date_range(
-                            start=start_date.date(), end=end_date.date(), freq="D"
-                        )
-                        complete_df = pd.DataFrame({"date_only": date_range})
-                        complete_df = complete_df.merge(
-                            activity_df, on="date_only", how="left"
-                        ).fillna(0)
-
-                        fig = px.bar(
-                            complete_df,
-                            x="date_only",
-                            y="commits",
-                            title=f"Commit Activity",
-                            labels={"date_only": "Date", "commits": "Commits"},
-                        )
-                        st.plotly_chart(fig)
-
-                        # Author activity chart
-                        author_df = commit_df["author"].value_counts().reset_index()
-
-                        fig = px.bar(
-                            author_df.head(10),
-                            x="author",
-                            y="count",
-                            title="Top Contributors",
-                            labels={"author": "Author", "count": "Number of Commits"},
-                        )
-                        st.plotly_chart(fig)
-
-                        # Commit table
-                        st.subheader("Recent Commits")
-                        st.dataframe(
-                            commit_df[["date", "author", "message", "files_changed"]]
-                            .rename(
-                                columns={
-                                    "date": "Date",
-                                    "author": "Author",
-                                    "message": "Message",
-                                    "files_changed": "Files Changed",
-                                }
-                            )
-                            .sort_values("Date", ascending=False),
-                            use_container_width=True,
-                        )
-
+                        render_file_structure(report)
+                    render_recent_activity(report, start_date, end_date)
                 except Exception as e:
                     st.error(f"Error analyzing repository: {str(e)}")
                     raise
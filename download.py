@@ -6,9 +6,10 @@ sys.path.append(".")
 
 from src.constants import DOWNLOADS_DIR, INPUT_FILE
 from src.download_repos import (
-    clone_or_update_repo,
+    clone_or_update_repos,
     create_download_dir,
     read_repos_file,
+    write_repo_manifest,
 )
 
 
@@ -19,11 +20,13 @@ def main() -> None:
 
     logging.info("Starting repository downloads...")
 
+    jobs = []
     for group_id, repo_url in repos.items():
         repo_name = Path(repo_url).stem.replace(".git", "")
-        folder = DOWNLOADS_DIR / f"{group_id}-{repo_name}"
-        clone_or_update_repo(repo_url, folder)
-        logging.info("------------------------")
+        jobs.append((repo_url, DOWNLOADS_DIR / f"{group_id}-{repo_name}"))
+
+    clone_or_update_repos(jobs)
+    write_repo_manifest(DOWNLOADS_DIR, [folder for _, folder in jobs])
 
     logging.info("All repositories downloaded successfully!")
 
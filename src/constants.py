@@ -8,6 +8,11 @@ PROJECT_FOLDER = Path(__file__).resolve().parent.parent
 
 # Define paths
 DOWNLOADS_DIR = PROJECT_FOLDER / "downloads"
+# Lists the repositories cloned into a downloads directory, one folder per line
+REPO_MANIFEST_FILENAME = ".repo_manifest"
 
 INPUT_FOLDER = PROJECT_FOLDER / "input"
 INPUT_FILE = INPUT_FOLDER / "repos"
+
+# Generated reports, persisted across app restarts
+REPORTS_CACHE_DIR = PROJECT_FOLDER / ".cache" / "reports"
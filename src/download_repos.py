@@ -1,8 +1,11 @@
+import asyncio
 import logging
-import subprocess
+import os
 import sys
 from pathlib import Path
 
+from src.constants import REPO_MANIFEST_FILENAME
+
 
 def create_download_dir(directory: Path) -> None:
     """Create the downloads directory if it doesn't exist."""
@@ -19,19 +22,79 @@ def read_repos_file(file_path: Path) -> dict[str, str]:
         )
         sys.exit(1)
 
-    with file_path.open("r") as file:
-        return {
-            f"gr{i:02}": line.strip()
-            for i, line in enumerate(file, start=1)
-            if line.strip() and not line.startswith("#")
-        }
+    lines = (line.strip() for line in file_path.read_text().splitlines())
+    return {
+        f"gr{i:02}": line
+        for i, line in enumerate(lines, start=1)
+        if line and not line.startswith("#")
+    }
 
 
-def clone_or_update_repo(repo_url: str, folder: Path) -> None:
+# Fail fast on authentication prompts instead of hanging a download
+GIT_ENV = {**os.environ, "GIT_TERMINAL_PROMPT": "0"}
+
+# Maximum number of git processes running at once
+MAX_CONCURRENT_DOWNLOADS = 16
+
+
+async def _run_git(*args: str) -> int:
+    """Run a git command without blocking the event loop, return its exit code."""
+    process = await asyncio.create_subprocess_exec("git", *args, env=GIT_ENV)
+    return await process.wait()
+
+
+async def clone_or_update_repo_async(repo_url: str, folder: Path) -> None:
     """Clone or update a Git repository."""
     if folder.is_dir():
         logging.info("Repository %s already exists, updating...", folder.name)
-        subprocess.run(["git", "-C", str(folder), "pull"], check=False)
+        if await _run_git("-C", str(folder), "fetch", "--prune", "--no-tags") == 0:
+            # Downloads are read-only mirrors: follow the remote even if rewritten
+            await _run_git("-C", str(folder), "reset", "--hard", "@{u}")
     else:
         logging.info("Cloning %s into %s...", repo_url, folder)
-        subprocess.run(["git", "clone", repo_url, str(folder)], check=False)
+        await _run_git("clone", "--single-branch", "--no-tags", repo_url, str(folder))
+
+
+def clone_or_update_repo(repo_url: str, folder: Path) -> None:
+    """Clone or update a Git repository."""
+    asyncio.run(clone_or_update_repo_async(repo_url, folder))
+
+
+def clone_or_update_repos(jobs: list[tuple[str, Path]]) -> None:
+    """Clone or update (repo_url, folder) pairs concurrently."""
+
+    async def run_all() -> None:
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_DOWNLOADS)
+
+        async def run_one(repo_url: str, folder: Path) -> None:
+            async with semaphore:
+                await clone_or_update_repo_async(repo_url, folder)
+            logging.info("%s done", folder.name)
+
+        await asyncio.gather(*(run_one(url, folder) for url, folder in jobs))
+
+    asyncio.run(run_all())
+
+
+def write_repo_manifest(directory: Path, folders: list[Path]) -> None:
+    """Record the cloned repositories of a downloads directory in its manifest.
+
+    Repositories already listed, from earlier runs, and those cloned by hand
+    directly in the directory are kept as long as they are still there.
+    """
+    manifest = directory / REPO_MANIFEST_FILENAME
+    try:
+        listed = manifest.read_text().splitlines()
+    except OSError:
+        listed = []
+    top_level = sorted(entry.name for entry in directory.iterdir() if entry.is_dir())
+    # dict keeps the first occurrence of each name, in order
+    candidates = dict.fromkeys(
+        [*listed, *(folder.name for folder in folders), *top_level]
+    )
+    names = [
+        name for name in candidates if name and (directory / name / ".git").exists()
+    ]
+    tmp_manifest = manifest.with_suffix(".tmp")
+    tmp_manifest.write_text("".join(f"{name}\n" for name in names))
+    tmp_manifest.replace(manifest)
@@ -1,8 +1,23 @@
 import json
+import os
 import re
 from enum import Enum, auto
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Optional, Sequence
+
+# Patterns made of these characters match a file of the same name anywhere
+_NAME_RE = re.compile(r"[\w.-]+")
+
+# Global inline flags such as (?i), only allowed at the start of a whole regex
+_INLINE_FLAGS_RE = re.compile(r"\(\?[aiLmsux]+\)")
+
+
+def _entry_sort_key(entry: os.DirEntry[str]) -> str:
+    """Directories first, then by suffix and stem, as Path.suffix/Path.stem split"""
+    name = entry.name
+    i = name.rfind(".")
+    suffix, stem = (name[i:], name[:i]) if 0 < i < len(name) - 1 else ("", name)
+    return f"{not entry.is_dir(follow_symlinks=False)}{suffix}{stem}"
 
 
 class TreeSignal(str, Enum):
@@ -21,7 +36,7 @@ class FileStructureAnalyzer:
         self,
         directory: str,
         max_depth: Optional[int] = None,
-        exclude_patterns: Optional[List[str]] = None,
+        exclude_patterns: Optional[Sequence[str | re.Pattern[str]]] = None,
     ):
         """
         Initialize the FileStructureAnalyzer.
@@ -29,13 +44,44 @@ class FileStructureAnalyzer:
         Args:
             directory (str): The directory to analyze
             max_depth (int, optional): Maximum depth to traverse (None for unlimited)
-            exclude_patterns (list, optional): List of regex patterns to exclude
+            exclude_patterns (list, optional): List of regex patterns to exclude,
+                either as strings or already compiled
         """
         self.directory = Path(directory)
         self.max_depth = max_depth
-        self.exclude_patterns = exclude_patterns or []
+        # re.compile returns already compiled patterns unchanged
         self.compiled_patterns = [
-            re.compile(pattern) for pattern in self.exclude_patterns
+            re.compile(pattern) for pattern in exclude_patterns or []
+        ]
+        self.exclude_patterns = [pattern.pattern for pattern in self.compiled_patterns]
+        # Names such as "node_modules" or ".venv": a node with that exact name is
+        # excluded without running the regex on its full path
+        self.exclude_names = frozenset(
+            pattern for pattern in self.exclude_patterns if _NAME_RE.fullmatch(pattern)
+        )
+        # One alternation is matched per path instead of one search per pattern.
+        # That is only equivalent for patterns sharing the same flags, without
+        # groups (names could clash, backreferences would be renumbered) nor
+        # global inline flags: the others are searched one by one.
+        self.exclude_regex: Optional[re.Pattern[str]] = None
+        combinable = [
+            pattern
+            for pattern in self.compiled_patterns
+            if not pattern.groups and not _INLINE_FLAGS_RE.search(pattern.pattern)
+        ]
+        flags = {pattern.flags for pattern in combinable}
+        if len(flags) == 1:
+            try:
+                self.exclude_regex = re.compile(
+                    "|".join(f"(?:{pattern.pattern})" for pattern in combinable),
+                    flags.pop(),
+                )
+            except re.error:
+                combinable = []
+        else:
+            combinable = []
+        self.uncombined_patterns = [
+            pattern for pattern in self.compiled_patterns if pattern not in combinable
         ]
 
     def should_exclude(self, path_str: str) -> bool:
@@ -48,47 +94,85 @@ class FileStructureAnalyzer:
         Returns:
             bool: True if the path should be excluded, False otherwise
         """
-        if Path(path_str).name == ".git":
+        name = os.path.basename(path_str)
+        if name == ".git" or name in self.exclude_names:
             return True
-        for pattern in self.compiled_patterns:
-            if pattern.search(path_str):
-                return True
-        return False
+        if self.exclude_regex is not None and self.exclude_regex.search(path_str):
+            return True
+        return any(pattern.search(path_str) for pattern in self.uncombined_patterns)
 
-    def build_tree(self, path: Path, current_depth: int = 0) -> TreeObject:
+    def build_tree(
+        self, path: str | os.PathLike[str], current_depth: int = 0
+    ) -> TreeObject:
         """
-        Build a tree structure recursively from a path.
+        Build a tree structure from a path, depth-first with an explicit stack.
 
         Args:
-            path (Path): The path to build the tree from
-            current_depth (int): Current depth in the recursion
+            path (str | PathLike): The path to build the tree from
+            current_depth (int): Depth of path in the tree
 
         Returns:
             TreeObject: A tree representation of the path
         """
+        path_str = os.fspath(path)
+        node = self._leaf_node(
+            path_str,
+            os.path.basename(path_str),
+            # the root is listed even through a symlink, unlike its children
+            os.path.isdir(path_str),
+            current_depth,
+        )
+        if node is not None:
+            return node
+
+        root: dict[str, FileStructureAnalyzer.TreeObject] = {}
+        # (directory path, its dict, its depth, parent dict, name in parent)
+        stack: list[tuple[str, dict, int, Optional[dict], str]] = [
+            (path_str, root, current_depth, None, "")
+        ]
+        while stack:
+            directory, tree, depth, parent, name = stack.pop()
+            try:
+                # DirEntry caches the file type: no stat call per child
+                with os.scandir(directory) as it:
+                    children = sorted(it, key=_entry_sort_key)
+            except PermissionError:
+                if parent is None:
+                    return "Permission denied"
+                parent[name] = "Permission denied"
+                continue
+
+            for child in children:
+                node = self._leaf_node(
+                    child.path,
+                    child.name,
+                    child.is_dir(follow_symlinks=False),
+                    depth + 1,
+                )
+                if node is None:
+                    # inserted now to keep the sorted order, filled when popped
+                    subtree: dict[str, FileStructureAnalyzer.TreeObject] = {}
+                    tree[child.name] = subtree
+                    stack.append((child.path, subtree, depth + 1, tree, child.name))
+                elif node is not TreeSignal.EXCLUDE:
+                    tree[child.name] = node
+
+        return root
+
+    def _leaf_node(
+        self, path_str: str, name: str, is_dir: bool, depth: int
+    ) -> Optional[TreeObject]:
+        """The node of a path that is not listed, None for a directory to list"""
+        if self.max_depth is not None and depth > self.max_depth:
+            return TreeSignal.END if is_dir else TreeSignal.STOP
 
-        if self.max_depth is not None and current_depth > self.max_depth:
-            return TreeSignal.STOP if path.is_file() else TreeSignal.END
-
-        path_str = str(path)
         if self.should_exclude(path_str):
             return TreeSignal.EXCLUDE
 
-        if path.is_file():
-            return str(path.name)
+        if not is_dir:
+            return name
 
-        result = {}
-        try:
-            for child in sorted(
-                path.iterdir(), key=lambda x: f"{x.is_file()}{x.suffix}{x.stem}"
-            ):
-                child_result = self.build_tree(child, current_depth + 1)
-                if child_result not in (TreeSignal.EXCLUDE,):
-                    result[child.name] = child_result
-        except PermissionError:
-            return "Permission denied"
-
-        return result
+        return None
 
     def get_file_structure(self) -> Dict[str, TreeObject]:
         """
@@ -100,29 +184,52 @@ class FileStructureAnalyzer:
         tree = {self.directory.name: self.build_tree(self.directory)}
         return tree
 
-    def get_formated_tree(self) -> tuple[dict[str, TreeObject], str, list[str]]:
-        def format_tree(
-            tree: dict[str, FileStructureAnalyzer.TreeObject], indent: str = ""
-        ) -> list[str]:
-            result = []
-            for i, (key, value) in enumerate(tree.items()):
-                is_last = i == len(tree) - 1
+    @staticmethod
+    def format_tree(tree: dict[str, TreeObject]) -> list[str]:
+        """
+        Render a file structure as tree view lines.
+
+        Args:
+            tree (dict): A file structure, as returned by get_file_structure
+
+        Returns:
+            list: One line per node, with box-drawing indentation
+        """
+        result = []
+        # Depth-first with an explicit stack of (children, last index, indent):
+        # a directory's children iterator is resumed once its subtree is done
+        stack = [(enumerate(tree.items()), len(tree) - 1, "")]
+        while stack:
+            children, last_index, indent = stack[-1]
+            for i, (key, value) in children:
+                is_last = i == last_index
                 prefix = "└── " if is_last else "├── "
 
                 if isinstance(value, dict):
                     result.append(f"{indent}{prefix}{key}/")
                     next_indent = indent + ("    " if is_last else "│   ")
-                    result.extend(format_tree(value, next_indent))
+                    stack.append(
+                        (enumerate(value.items()), len(value) - 1, next_indent)
+                    )
+                    break
                 elif value == TreeSignal.END:
                     result.append(f"{indent}{prefix}{key}/ ...")
                 elif value == TreeSignal.STOP:
                     result.append(f"{indent}{prefix}{key}")
                 else:
                     result.append(f"{indent}{prefix}{value}")
-            return result
+            else:
+                stack.pop()
+        return result
 
+    @staticmethod
+    def tree_to_json(tree: dict[str, TreeObject]) -> str:
+        """Raw JSON view of a tree, keeping non-ASCII file names readable"""
+        return json.dumps(tree, indent=2, ensure_ascii=False)
+
+    def get_formated_tree(self) -> tuple[dict[str, TreeObject], str, list[str]]:
         tree = self.get_file_structure()
-        raw_json = json.dumps(tree, indent=2)
-        tree_view = format_tree(tree)
+        raw_json = self.tree_to_json(tree)
+        tree_view = self.format_tree(tree)
 
         return tree, raw_json, tree_view
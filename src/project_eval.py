@@ -1,7 +1,11 @@
 # src/project_evaluator.py
 import json
+from operator import attrgetter
 from pathlib import Path
-from typing import Any, Dict, Optional, Tuple
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from pydantic import ValidationError
 
 from src.evaluation import (
     BonusML,
@@ -12,6 +16,65 @@ from src.evaluation import (
     StructureProjetDesign,
 )
 
+# Scored fields of each evaluation section, read in one C-level call
+_structure_scores = attrgetter(
+    "architecture_modulaire",
+    "lisibilite_code",
+    "refactorisation",
+    "tests_unitaires",
+    "environnement_virtuel",
+)
+_collaboration_scores = attrgetter("git_utilisation", "repartition_taches")
+_documentation_scores = attrgetter(
+    "readme",
+    "code_commente",
+    "guide_utilisation",
+    "livrables_propres",
+    "prompt_engineering",
+)
+_bonus_ml_scores = attrgetter(
+    "choix_modele",
+    "pretraitement",
+    "evaluation_modele",
+    "analyse_critique",
+    "shap_avance",
+)
+_bonus_tech_scores = attrgetter(
+    "pipeline_ml",
+    "shap_integre",
+    "interface_fonctionnelle",
+    "complexite",
+    "dependances",
+)
+
+# Maximum score of each category, merged into every calculate_scores result
+_SCORE_MAXES: Mapping[str, int] = MappingProxyType(
+    {
+        "structure_max": 40,
+        "collaboration_max": 25,
+        "documentation_max": 35,
+        "main_max": 100,
+        "bonus_ml_max": 5,
+        "bonus_tech_max": 5,
+        "total_bonus_max": 10,
+        "final_max": 110,
+    }
+)
+
+_SUMMARY_TEMPLATE = """\
+## Evaluation Summary
+
+**Main Score:** {main_score}/{main_max} ({percentage}%)
+**Bonus Score:** {total_bonus}/{total_bonus_max}
+**Final Score:** {final_score}/{final_max}
+
+### Breakdown:
+- **Structure & Design:** {structure_score}/{structure_max}
+- **Collaboration:** {collaboration_score}/{collaboration_max}
+- **Documentation:** {documentation_score}/{documentation_max}
+- **ML Bonus:** {bonus_ml_score}/{bonus_ml_max}
+- **Technical Bonus:** {bonus_tech_score}/{bonus_tech_max}"""
+
 
 class ProjectEvaluator:
     """Manages project evaluation JSON files and scoring calculations."""
@@ -33,8 +96,17 @@ class ProjectEvaluator:
             return None, False, "Evaluation file does not exist"
 
         try:
-            with open(self.evaluation_file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            raw = self.evaluation_file_path.read_bytes()
+            # Parse and validate in one pass, without an intermediate dict
+            return EvaluationProjet.model_validate_json(raw), True, ""
+        except ValidationError:
+            pass
+        except Exception as e:
+            return None, False, f"Validation error: {str(e)}"
+
+        # Invalid file: parse it again only to report what is wrong
+        try:
+            data = json.loads(raw)
 
             if not data:
                 return None, False, "Evaluation file is empty"
@@ -59,12 +131,11 @@ class ProjectEvaluator:
             bool: True if successful, False otherwise
         """
         try:
-            eval_dict = (
-                evaluation.model_dump()
-            )  # or asdict(evaluation) if not using pydantic
             print(f"***Saving evaluation to {self.evaluation_file_path}")
-            with open(self.evaluation_file_path, "w", encoding="utf-8") as f:
-                json.dump(eval_dict, f, indent=4, ensure_ascii=False)
+            # Serialized by pydantic-core directly, without a model_dump() dict
+            self.evaluation_file_path.write_text(
+                evaluation.model_dump_json(indent=4), encoding="utf-8"
+            )
             return True
         except Exception as e:
             print(f"Error saving evaluation: {e}")
@@ -72,60 +143,40 @@ class ProjectEvaluator:
 
     def create_default_evaluation(self) -> EvaluationProjet:
         """Create a default evaluation with zero scores."""
-        return EvaluationProjet(
-            structure=StructureProjetDesign(
+        # Zero scores are valid by construction: skip validation, comments
+        # take their "" default
+        return EvaluationProjet.model_construct(
+            structure=StructureProjetDesign.model_construct(
                 architecture_modulaire=0,
-                architecture_modulaire_comment="",
                 lisibilite_code=0,
-                lisibilite_code_comment="",
                 refactorisation=0,
-                refactorisation_comment="",
                 tests_unitaires=0,
-                tests_unitaires_comment="",
                 environnement_virtuel=0,
-                environnement_virtuel_comment="",
             ),
-            collaboration=CollaborationQualite(
+            collaboration=CollaborationQualite.model_construct(
                 git_utilisation=0,
-                git_utilisation_comment="",
                 repartition_taches=0,
-                repartition_taches_comment="",
             ),
-            documentation=DocumentationLivrables(
+            documentation=DocumentationLivrables.model_construct(
                 readme=0,
-                readme_comment="",
                 code_commente=0,
-                code_commente_comment="",
                 guide_utilisation=0,
-                guide_utilisation_comment="",
                 livrables_propres=0,
-                livrables_propres_comment="",
                 prompt_engineering=0,
-                prompt_engineering_comment="",
             ),
-            bonus_ml=BonusML(
+            bonus_ml=BonusML.model_construct(
                 choix_modele=0,
-                choix_modele_comment="",
                 pretraitement=0,
-                pretraitement_comment="",
                 evaluation_modele=0,
-                evaluation_modele_comment="",
                 analyse_critique=0,
-                analyse_critique_comment="",
                 shap_avance=0,
-                shap_avance_comment="",
             ),
-            bonus_tech=BonusTechnique(
+            bonus_tech=BonusTechnique.model_construct(
                 pipeline_ml=0,
-                pipeline_ml_comment="",
                 shap_integre=0,
-                shap_integre_comment="",
                 interface_fonctionnelle=0,
-                interface_fonctionnelle_comment="",
                 complexite=0,
-                complexite_comment="",
                 dependances=0,
-                dependances_comment="",
             ),
         )
 
@@ -140,49 +191,22 @@ class ProjectEvaluator:
             Dict containing score breakdown and totals
         """
         # Structure scores (max 40)
-        structure_score = (
-            evaluation.structure.architecture_modulaire
-            + evaluation.structure.lisibilite_code
-            + evaluation.structure.refactorisation
-            + evaluation.structure.tests_unitaires
-            + evaluation.structure.environnement_virtuel
-        )
+        structure_score = sum(_structure_scores(evaluation.structure))
 
         # Collaboration scores (max 25)
-        collaboration_score = (
-            evaluation.collaboration.git_utilisation
-            + evaluation.collaboration.repartition_taches
-        )
+        collaboration_score = sum(_collaboration_scores(evaluation.collaboration))
 
         # Documentation scores (max 35)
-        documentation_score = (
-            evaluation.documentation.readme
-            + evaluation.documentation.code_commente
-            + evaluation.documentation.guide_utilisation
-            + evaluation.documentation.livrables_propres
-            + evaluation.documentation.prompt_engineering
-        )
+        documentation_score = sum(_documentation_scores(evaluation.documentation))
 
         # Main score (max 100)
         main_score = structure_score + collaboration_score + documentation_score
 
         # ML Bonus scores (max 5)
-        bonus_ml_score = (
-            evaluation.bonus_ml.choix_modele
-            + evaluation.bonus_ml.pretraitement
-            + evaluation.bonus_ml.evaluation_modele
-            + evaluation.bonus_ml.analyse_critique
-            + evaluation.bonus_ml.shap_avance
-        )
+        bonus_ml_score = sum(_bonus_ml_scores(evaluation.bonus_ml))
 
         # Technical Bonus scores (max 5)
-        bonus_tech_score = (
-            evaluation.bonus_tech.pipeline_ml
-            + evaluation.bonus_tech.shap_integre
-            + evaluation.bonus_tech.interface_fonctionnelle
-            + evaluation.bonus_tech.complexite
-            + evaluation.bonus_tech.dependances
-        )
+        bonus_tech_score = sum(_bonus_tech_scores(evaluation.bonus_tech))
 
         # Total bonus
         total_bonus = bonus_ml_score + bonus_tech_score
@@ -191,42 +215,19 @@ class ProjectEvaluator:
         final_score = main_score + total_bonus
 
         return {
+            **_SCORE_MAXES,
             "structure_score": structure_score,
-            "structure_max": 40,
             "collaboration_score": collaboration_score,
-            "collaboration_max": 25,
             "documentation_score": documentation_score,
-            "documentation_max": 35,
             "main_score": main_score,
-            "main_max": 100,
             "bonus_ml_score": bonus_ml_score,
-            "bonus_ml_max": 5,
             "bonus_tech_score": bonus_tech_score,
-            "bonus_tech_max": 5,
             "total_bonus": total_bonus,
-            "total_bonus_max": 10,
             "final_score": final_score,
-            "final_max": 110,
-            "percentage": round((main_score / 100) * 100, 1) if main_score > 0 else 0,
+            # main_max is 100: the percentage is the main score itself
+            "percentage": float(main_score) if main_score > 0 else 0,
         }
 
     def get_evaluation_summary(self, evaluation: EvaluationProjet) -> str:
         """Generate a text summary of the evaluation."""
-        scores = self.calculate_scores(evaluation)
-
-        summary = f"""
-## Evaluation Summary
-
-**Main Score:** {scores["main_score"]}/{scores["main_max"]} ({scores["percentage"]}%)
-**Bonus Score:** {scores["total_bonus"]}/{scores["total_bonus_max"]}
-**Final Score:** {scores["final_score"]}/{scores["final_max"]}
-
-### Breakdown:
-- **Structure & Design:** {scores["structure_score"]}/{scores["structure_max"]}
-- **Collaboration:** {scores["collaboration_score"]}/{scores["collaboration_max"]}
-- **Documentation:** {scores["documentation_score"]}/{scores["documentation_max"]}
-- **ML Bonus:** {scores["bonus_ml_score"]}/{scores["bonus_ml_max"]}
-- **Technical Bonus:** {scores["bonus_tech_score"]}/{scores["bonus_tech_max"]}
-        """.strip()
-
-        return summary
+        return _SUMMARY_TEMPLATE.format_map(self.calculate_scores(evaluation))
@@ -1,14 +1,22 @@
+import codecs
+import io
 import os
-from collections import defaultdict
-from dataclasses import dataclass
+import subprocess
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime
+from functools import cached_property, partial
 from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, TypeVar
 
 import git
-import pandas as pd
+import numpy as np
 
 from src.file_structure import FileStructureAnalyzer
 
+T = TypeVar("T")
+
 
 @dataclass
 class BasicStats:
@@ -46,11 +54,15 @@ class CommitEntry:
 @dataclass
 class FileStructure:
     structure: dict[str, FileStructureAnalyzer.TreeObject]
-    structure_raw_json: str
     structure_formated: list[str]
     excluded_patterns: list[str]
     max_depth: int | None
 
+    @cached_property
+    def structure_raw_json(self) -> str:
+        # Only serialized when the raw JSON view is opened
+        return FileStructureAnalyzer.tree_to_json(self.structure)
+
 
 @dataclass
 class RepoReport:
@@ -62,9 +74,115 @@ class RepoReport:
     recent_activity: RecentActivity | None
     commit_history: list[CommitEntry]
     file_structure: FileStructure
+    # commit_history as columns: one array per CommitEntry field
+    commit_history_columns: dict[str, np.ndarray] = field(default_factory=dict)
+
+
+def commit_history_to_columns(
+    commit_history: list[CommitEntry],
+) -> dict[str, np.ndarray]:
+    """Convert commits to column arrays, with dates as UTC datetime64[ns]"""
+    # epoch microseconds are already UTC: no per-value timezone conversion needed
+    timestamps_us = [round(c.date.timestamp() * 1e6) for c in commit_history]
+    return {
+        "date": np.array(timestamps_us, dtype=np.int64)
+        .astype("datetime64[us]")
+        .astype("datetime64[ns]"),
+        "author_email": np.array(
+            [c.author_email for c in commit_history], dtype=object
+        ),
+        "author_name": np.array([c.author_name for c in commit_history], dtype=object),
+        "message": np.array([c.message for c in commit_history], dtype=object),
+        "files_changed": np.array(
+            [c.files_changed for c in commit_history], dtype=np.int32
+        ),
+    }
+
+
+# Files are read by chunks of this size, to bound memory on large files
+LINE_COUNT_CHUNK_SIZE = 1 << 20
+
+
+def count_chunked_text_lines(chunks: Iterable[bytes]) -> int:
+    """Count the lines of UTF-8 content read by chunks; 0 if it is binary"""
+    # Invalid UTF-8 stops the count at the chunk it is found in
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    lines = 0
+    last_byte = b""
+    for chunk in chunks:
+        if not chunk:
+            continue
+        try:
+            decoder.decode(chunk)
+        except UnicodeDecodeError:
+            return 0
+        # bytes.count runs in C: count "\n" and lone "\r"
+        lines += chunk.count(b"\n") + chunk.count(b"\r") - chunk.count(b"\r\n")
+        if last_byte == b"\r" and chunk[:1] == b"\n":
+            # "\r\n" split over two chunks was counted twice
+            lines -= 1
+        last_byte = chunk[-1:]
+    try:
+        decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        return 0
+    if not last_byte:
+        return 0
+    # a last unterminated line
+    return lines + (last_byte not in (b"\n", b"\r"))
+
+
+def count_text_lines(content: bytes) -> int:
+    """Count the lines of a UTF-8 file, as iterating over it would; 0 if binary"""
+    return count_chunked_text_lines((content,))
+
+
+def _count_file_lines(path: str) -> int:
+    """Count the lines of a UTF-8 file, 0 if it is binary or can't be read"""
+    try:
+        with open(path, "rb") as f:
+            return count_chunked_text_lines(
+                iter(partial(f.read, LINE_COUNT_CHUNK_SIZE), b"")
+            )
+    except OSError:
+        return 0
+
+
+# Index mode of submodules, which have no file in the working tree
+GITLINK_MODE = "160000"
+
+# Below this many files, line counting stays serial: threads don't pay off
+PARALLEL_LINE_COUNT_MIN_FILES = 32
+
+GIT_LOG_RECORD_SEP = "\x1e"
+GIT_LOG_FIELD_SEP = "\x1f"
+# One record per commit: committer date, author name, author email, raw message
+GIT_LOG_ARGS = ("log", "--pretty=format:%x1e%cI%x1f%an%x1f%ae%x1f%B%x1f")
+# Then one line per changed file. Merges are diffed against their first parent
+# and renames are not detected, as GitPython's Commit.stats does.
+GIT_LOG_NUMSTAT_ARGS = ("--numstat", "--no-renames", "--diff-merges=first-parent")
+
+
+def _iter_files(root: str | os.PathLike[str]) -> Iterator[os.DirEntry[str]]:
+    """Yield the non-directory entries under root, without following symlinks"""
+    stack: list[str | os.PathLike[str]] = [root]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                else:
+                    yield entry
 
 
 def parse_byte_message(text: str | bytes | None):
+    # str is by far the most common input: return it before any other check
+    if type(text) is str:
+        return text
     if text is None:
         return ""
     if isinstance(text, bytes):
@@ -87,68 +205,178 @@ class RepoStats:
             raise ValueError(f"Invalid repository path: {repo_path}")
         self.working_tree_dir = self.repo.working_tree_dir
         self.repo_name = Path(self.working_tree_dir).name
+        # Results that only depend on the checked out commit, see _memoized
+        self._memo: dict[str, Any] = {}
+        self._memo_head: str | None = None
+
+    def _memoized(self, key: str, compute: Callable[[], T]) -> T:
+        """Return compute(), reusing its result while HEAD stays on one commit"""
+        try:
+            head = self.repo.head.commit.hexsha
+        except ValueError:
+            # no commit yet: nothing stable to key on
+            return compute()
+        if head != self._memo_head:
+            self._memo = {}
+            self._memo_head = head
+        if key not in self._memo:
+            self._memo[key] = compute()
+        return self._memo[key]
+
+    def invalidate(self) -> None:
+        """Forget memoized results, e.g. after editing the working tree"""
+        self._memo = {}
+        self._memo_head = None
 
     def get_basic_stats(self) -> BasicStats:
+        return self._memoized("basic_stats", self._compute_basic_stats)
+
+    def _compute_basic_stats(self) -> BasicStats:
+        # One author email per commit reachable from HEAD, in a single git call
+        author_emails = subprocess.run(
+            ["git", "-C", self.working_tree_dir, "log", "--format=%ae"],
+            capture_output=True,
+            check=True,
+            encoding="utf-8",
+            errors="replace",
+        ).stdout.splitlines()
         return BasicStats(
-            total_commits=sum(1 for _ in self.repo.iter_commits()),
+            total_commits=len(author_emails),
             active_branches=len(list(self.repo.heads)),
-            contributors=len(set(c.author.email for c in self.repo.iter_commits())),
+            contributors=len(set(author_emails)),
             last_commit=self.repo.head.commit.committed_datetime,
             repo_size_mb=self._get_repo_size(),
         )
 
     def get_file_stats(self) -> FileStats:
-        file_counts: dict[str, int] = defaultdict(int)
-        total_lines = 0
+        """File counts and line totals of the tracked files
 
-        for root, _, files in os.walk(self.working_tree_dir):
-            if ".git" in root:
-                continue
+        Cached per HEAD commit: edits to the working tree are not seen until
+        the next commit or a call to invalidate().
+        """
+        return self._memoized("file_stats", self._compute_file_stats)
 
-            for file in files:
-                ext = Path(file).suffix
-                file_path = os.path.join(root, file)
-                file_counts[ext or "no extension"] += 1
+    def _compute_file_stats(self) -> FileStats:
+        # Tracked files only, as "<mode> <blob sha> <stage>\t<path>" index entries
+        index_entries = subprocess.run(
+            ["git", "-C", self.working_tree_dir, "ls-files", "-s", "-z"],
+            capture_output=True,
+            check=True,
+            encoding="utf-8",
+            errors="surrogateescape",
+        ).stdout.split("\0")[:-1]
+        paths = []
+        for entry in index_entries:
+            info, _, path = entry.partition("\t")
+            if not info.startswith(GITLINK_MODE):
+                paths.append(path)
+        file_counts = Counter(
+            os.path.splitext(path)[1] or "no extension" for path in paths
+        )
 
-                try:
-                    with open(file_path, "r", encoding="utf-8") as f:
-                        total_lines += sum(1 for _ in f)
-                except:
-                    pass
+        # Reads are IO-bound: overlap them in threads on larger repositories
+        file_paths = [os.path.join(self.working_tree_dir, path) for path in paths]
+        if len(file_paths) < PARALLEL_LINE_COUNT_MIN_FILES:
+            total_lines = sum(map(_count_file_lines, file_paths))
+        else:
+            with ThreadPoolExecutor(
+                max_workers=min(32, (os.cpu_count() or 1) * 4)
+            ) as executor:
+                total_lines = sum(executor.map(_count_file_lines, file_paths))
 
         return FileStats(
             file_types=dict(file_counts),
-            total_files=sum(file_counts.values()),
+            total_files=len(paths),
             total_lines=total_lines,
         )
 
-    def get_commit_history(self, start_date, end_date) -> list[CommitEntry]:
-        commits = []
-        for commit in self.repo.iter_commits():
-            if (
-                commit.committed_datetime < start_date
-                and commit.committed_datetime > end_date
-            ):
-                break
-
-            commits.append(
-                CommitEntry(
-                    date=commit.committed_datetime,
-                    author_email=commit.author.email or "Unknown",
-                    author_name=commit.author.name or "Unknown",
-                    message=parse_byte_message(commit.message),
-                    files_changed=len(commit.stats.files),
+    def get_commit_history(
+        self, start_date, end_date, include_file_counts: bool = True
+    ) -> list[CommitEntry]:
+        key = (
+            f"commit_history:{start_date.isoformat()}:{end_date.isoformat()}"
+            f":{include_file_counts}"
+        )
+        # Only keep the last range asked for, not one entry per range ever tried
+        for stale in [k for k in self._memo if k.startswith("commit_history:")]:
+            if stale != key:
+                del self._memo[stale]
+        return self._memoized(
+            key,
+            lambda: list(
+                self.iter_commit_history(start_date, end_date, include_file_counts)
+            ),
+        )
+
+    def iter_commit_history(
+        self, start_date, end_date, include_file_counts: bool = True
+    ) -> Iterator[CommitEntry]:
+        """
+        Yield the commits of the date range, newest first, as git outputs them.
+
+        Counting the files changed makes git diff every commit, which dominates
+        on large histories: with include_file_counts=False, files_changed is 0.
+        """
+        # git filters on the committer date and stops walking past start_date
+        process = subprocess.Popen(
+            [
+                "git",
+                "-C",
+                self.working_tree_dir,
+                *GIT_LOG_ARGS,
+                *(GIT_LOG_NUMSTAT_ARGS if include_file_counts else ()),
+                f"--since={start_date.isoformat()}",
+                f"--until={end_date.isoformat()}",
+            ],
+            stdout=subprocess.PIPE,
+        )
+        assert process.stdout is not None
+        # newline="" keeps the \r\n of commit messages written on Windows
+        lines = io.TextIOWrapper(
+            process.stdout, encoding="utf-8", errors="replace", newline=""
+        )
+        # a commit is only complete once its --numstat lines are read
+        commit: CommitEntry | None = None
+        with process:
+            header = None
+            for line in lines:
+                if line.startswith(GIT_LOG_RECORD_SEP):
+                    header = line[1:]
+                elif header is not None:
+                    # multi-line commit message
+                    header += line
+                elif commit is not None and line.strip():
+                    # one --numstat line per changed file
+                    commit.files_changed += 1
+                    continue
+                else:
+                    continue
+
+                if header.count(GIT_LOG_FIELD_SEP) < 4:
+                    continue
+                date, author_name, author_email, message, _ = header.split(
+                    GIT_LOG_FIELD_SEP
                 )
-            )
-        return commits
+                header = None
+                if commit is not None:
+                    yield commit
+                commit = CommitEntry(
+                    date=datetime.fromisoformat(date),
+                    author_email=author_email or "Unknown",
+                    author_name=author_name or "Unknown",
+                    message=message,
+                    files_changed=0,
+                )
+        if process.returncode:
+            raise subprocess.CalledProcessError(process.returncode, process.args)
+        if commit is not None:
+            yield commit
 
     def _get_repo_size(self) -> float:
-        total_size = 0
-        for root, _, files in os.walk(self.working_tree_dir):
-            total_size += sum(
-                os.path.getsize(os.path.join(root, name))  # type: ignore
-                for name in files
-            )
+        total_size = sum(
+            entry.stat(follow_symlinks=False).st_size
+            for entry in _iter_files(self.working_tree_dir)
+        )
         return round(total_size / (1024 * 1024), 2)  # Convert to MB
 
     def generate_report(
@@ -157,19 +385,22 @@ class RepoStats:
         commit_history = self.get_commit_history(
             start_date=start_date, end_date=end_date
         )
+        commit_history_columns = commit_history_to_columns(commit_history)
 
         # Calculate activity metrics
         recent_activity = None
         if commit_history:
-            df = pd.DataFrame([c.__dict__ for c in commit_history])
-            df["date"] = pd.to_datetime(df["date"], utc=True)
-            df["date_only"] = df["date"].dt.date
-            commits_by_day = df.groupby("date_only").size()
+            # Commits per (UTC) day with at least one commit
+            _, commits_by_day = np.unique(
+                commit_history_columns["date"].astype("datetime64[D]"),
+                return_counts=True,
+            )
+            authors = Counter(commit.author_name for commit in commit_history)
             recent_activity = RecentActivity(
                 total_recent_commits=len(commit_history),
-                avg_commits_per_day=round(commits_by_day.mean(), 2),
-                max_commits_in_day=commits_by_day.max(),
-                most_active_authors=df["author_name"].value_counts().head(5).to_dict(),
+                avg_commits_per_day=round(float(commits_by_day.mean()), 2),
+                max_commits_in_day=int(commits_by_day.max()),
+                most_active_authors=dict(authors.most_common(5)),
             )
 
         # Get file structure with optional depth and exclusion patterns
@@ -178,11 +409,10 @@ class RepoStats:
             exclude_patterns=exclude_patterns,
             max_depth=max_depth,
         )
-        structure, raw_json_structure, tree_view_structure = fs.get_formated_tree()
+        structure = fs.get_file_structure()
         file_structure = FileStructure(
             structure=structure,
-            structure_raw_json=raw_json_structure,
-            structure_formated=tree_view_structure,
+            structure_formated=fs.format_tree(structure),
             excluded_patterns=fs.exclude_patterns,
             max_depth=fs.max_depth,
         )
@@ -198,4 +428,5 @@ class RepoStats:
             recent_activity=recent_activity,
             commit_history=commit_history,
             file_structure=file_structure,
+            commit_history_columns=commit_history_columns,
         )
@@ -8,6 +8,25 @@ import git
 import pytest
 
 
+@pytest.fixture(autouse=True, scope="session")
+def git_config(tmp_path_factory):
+    """
+    Run git with a minimal global config providing the test identity, and no
+    system config, so the developer's settings (signing, hooks...) don't apply.
+    Repository config still takes precedence over it. Test repositories are
+    throwaway: git does not fsync anything it writes to them.
+    """
+    gitconfig = tmp_path_factory.mktemp("git") / "gitconfig"
+    gitconfig.write_text(
+        "[user]\n\tname = Test User\n\temail = test@example.com\n"
+        "[core]\n\tfsync = none\n"
+    )
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("GIT_CONFIG_GLOBAL", str(gitconfig))
+        monkeypatch.setenv("GIT_CONFIG_SYSTEM", os.devnull)
+        yield
+
+
 @pytest.fixture(scope="session")
 def sample_repo_fixture():
     """
@@ -0,0 +1,223 @@
+import os
+import re
+from concurrent.futures import Future
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+import git
+import pytest
+import streamlit as st
+
+from app import (
+    _cached_report,
+    _check_pending_saves,
+    _date_range_bounds,
+    _find_repositories_uncached,
+    _prune_report_cache,
+    _read_repo_manifest,
+    find_repositories,
+)
+from src.constants import REPO_MANIFEST_FILENAME
+from src.repo_stats import RepoStats
+
+
+class TestDateRangeBounds:
+    def test_bounds_cover_both_days(self) -> None:
+        """Test that the range starts and ends with the selected days."""
+        start_date, end_date = _date_range_bounds(date(2024, 1, 1), date(2024, 1, 10))
+
+        assert start_date == datetime(2024, 1, 1, tzinfo=timezone.utc)
+        assert end_date == datetime(2024, 1, 10, 23, 59, 59, tzinfo=timezone.utc)
+
+    def test_commits_of_the_end_day_are_included(self, tmp_path: Path) -> None:
+        """Test that a commit made on the selected end day is in the history."""
+        repo = git.Repo.init(tmp_path)
+        actor = git.Actor("Test User", "test@example.com")
+        Path(tmp_path, "test.py").write_bytes(b"print('Hello, World!')\n")
+        repo.index.add(["test.py"])
+        commit_date = datetime(2024, 1, 10, 18, 30, tzinfo=timezone.utc)
+        repo.index.commit(
+            "Initial commit",
+            author=actor,
+            committer=actor,
+            author_date=commit_date,
+            commit_date=commit_date,
+        )
+
+        commit_history = RepoStats(str(tmp_path)).get_commit_history(
+            *_date_range_bounds(date(2024, 1, 1), date(2024, 1, 10))
+        )
+
+        assert [commit.message for commit in commit_history] == ["Initial commit"]
+
+
+class TestReportCache:
+    @pytest.fixture
+    def generated(self, monkeypatch: pytest.MonkeyPatch) -> list[str]:
+        """Replace report generation, recording the repositories it runs for."""
+        calls: list[str] = []
+
+        def generate_report(repo_path: str, *args: object) -> dict[str, str]:
+            calls.append(repo_path)
+            return {"repository": repo_path}
+
+        monkeypatch.setattr("app._generate_report", generate_report)
+        return calls
+
+    def test_report_is_reused_from_disk(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch, generated: list[str]
+    ) -> None:
+        """Test that a cached report is loaded instead of generated again."""
+        cache_dir = tmp_path / "cache"
+        monkeypatch.setattr("app.REPORTS_CACHE_DIR", cache_dir)
+        args = ("head", "2024-01-01", "2024-01-10", 1, ())
+
+        first = _cached_report(str(tmp_path / "repo"), *args)
+        second = _cached_report(str(tmp_path / "repo"), *args)
+
+        assert first == second == {"repository": str(tmp_path / "repo")}
+        assert len(generated) == 1
+        assert [path.suffix for path in cache_dir.iterdir()] == [".pkl"]
+
+    def test_unwritable_cache_dir(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch, generated: list[str]
+    ) -> None:
+        """Test that the report is still returned when the cache can't be written."""
+        cache_dir = tmp_path / "cache"
+        cache_dir.write_text("not a directory")
+        monkeypatch.setattr("app.REPORTS_CACHE_DIR", cache_dir)
+
+        report = _cached_report(
+            str(tmp_path / "repo"), "head", "2024-01-01", "2024-01-10", 1, ()
+        )
+
+        assert report == {"repository": str(tmp_path / "repo")}
+
+    def test_long_exclude_patterns_have_their_own_report(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch, generated: list[str]
+    ) -> None:
+        """Test patterns that only differ after repr()'s 200 characters."""
+        monkeypatch.setattr("app.REPORTS_CACHE_DIR", tmp_path / "cache")
+        repo_path = str(tmp_path / "repo")
+        args = ("head", "2024-01-01", "2024-01-10", 1)
+
+        _cached_report(repo_path, *args, (re.compile("x" * 250 + "a"),))
+        _cached_report(repo_path, *args, (re.compile("x" * 250 + "b"),))
+
+        assert generated == [repo_path, repo_path]
+
+    def test_same_name_repositories_keep_their_reports(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch, generated: list[str]
+    ) -> None:
+        """Test that pruning only removes reports of the same repository path."""
+        cache_dir = tmp_path / "cache"
+        monkeypatch.setattr("app.REPORTS_CACHE_DIR", cache_dir)
+        args = ("2024-01-01", "2024-01-10", 1, ())
+        repo1, repo2 = (
+            str(tmp_path / "owner1" / "repo"),
+            str(tmp_path / "owner2" / "repo"),
+        )
+
+        _cached_report(repo1, "aaaa", *args)
+        _cached_report(repo2, "aaaa", *args)
+        _cached_report(repo1, "bbbb", *args)
+        _cached_report(repo2, "aaaa", *args)
+
+        assert generated == [repo1, repo2, repo1]
+        assert len(list(cache_dir.iterdir())) == 2
+
+    def test_prune_ignores_removed_files(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test pruning a report that another session removed meanwhile."""
+        monkeypatch.setattr("app.REPORTS_CACHE_DIR", tmp_path)
+        (tmp_path / f"repo-0123456789ab-aaaa-{'0' * 40}.pkl").write_bytes(b"")
+
+        def unlink(path: str) -> None:
+            raise FileNotFoundError(path)
+
+        monkeypatch.setattr(os, "unlink", unlink)
+        _prune_report_cache("repo-0123456789ab", "bbbb")
+
+    def test_prune_ignores_removed_cache_dir(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test pruning when the cache directory was removed meanwhile."""
+        monkeypatch.setattr("app.REPORTS_CACHE_DIR", tmp_path / "removed")
+
+        _prune_report_cache("repo-0123456789ab", "bbbb")
+
+
+def test_check_pending_saves_keeps_unfinished_saves() -> None:
+    """Test that unfinished saves are kept for the next run, without waiting."""
+    finished: Future[bool] = Future()
+    finished.set_result(True)
+    unfinished: Future[bool] = Future()
+    st.session_state["pending_saves"] = [finished, unfinished]
+
+    _check_pending_saves()
+
+    assert st.session_state.pop("pending_saves") == [unfinished]
+
+
+class TestFindRepositories:
+    @pytest.fixture
+    def downloads(self, tmp_path: Path) -> Path:
+        """A directory of fake repositories, only made of their .git directory."""
+        for repo in [
+            "repo1",
+            "owner/repo2",
+            # nested in a repository: not listed
+            "repo1/vendor/nested",
+            # hidden or non-repository directories: not searched
+            ".cache/repo3",
+            "node_modules/repo4",
+            "venv/repo5",
+        ]:
+            (tmp_path / repo / ".git").mkdir(parents=True)
+        # worktree, submodule or --separate-git-dir checkout: .git is a file
+        (tmp_path / "worktree").mkdir()
+        (tmp_path / "worktree" / ".git").write_text("gitdir: /elsewhere/.git\n")
+        (tmp_path / "empty").mkdir()
+        (tmp_path / "file.txt").write_text("not a repository")
+        return tmp_path
+
+    def test_find_repositories_uncached(self, downloads: Path) -> None:
+        """Test the walk stops at .git and skips hidden and non-repo directories."""
+        repositories = _find_repositories_uncached(str(downloads))
+
+        assert sorted(repositories) == [
+            str(downloads / "owner" / "repo2"),
+            str(downloads / "repo1"),
+            str(downloads / "worktree"),
+        ]
+
+    def test_read_repo_manifest(self, downloads: Path) -> None:
+        """Test the manifest lists existing repositories only."""
+        assert _read_repo_manifest(str(downloads)) is None
+
+        (downloads / REPO_MANIFEST_FILENAME).write_text(
+            "repo1\n\nempty\nmissing\nworktree\n"
+        )
+
+        assert _read_repo_manifest(str(downloads)) == [
+            str(downloads / "repo1"),
+            str(downloads / "worktree"),
+        ]
+
+    def test_find_repositories(self, downloads: Path) -> None:
+        """Test the manifest is used when present, the walk otherwise."""
+        paths, names = find_repositories(str(downloads), 0)
+        assert names == ["repo1", "repo2", "worktree"]
+        assert paths == [
+            str(downloads / "repo1"),
+            str(downloads / "owner" / "repo2"),
+            str(downloads / "worktree"),
+        ]
+
+        (downloads / REPO_MANIFEST_FILENAME).write_text("repo1\n")
+
+        assert find_repositories(str(downloads), 1) == (
+            [str(downloads / "repo1")],
+            ["repo1"],
+        )
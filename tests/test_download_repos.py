@@ -0,0 +1,21 @@
+from pathlib import Path
+
+from src.constants import REPO_MANIFEST_FILENAME
+from src.download_repos import write_repo_manifest
+
+
+class TestWriteRepoManifest:
+    def test_manifest_keeps_earlier_and_hand_cloned_repositories(
+        self, tmp_path: Path
+    ) -> None:
+        """Test that a download run adds to the manifest instead of replacing it."""
+        for name in ["gr01-old", "gr02-new", "by-hand"]:
+            (tmp_path / name / ".git").mkdir(parents=True)
+        (tmp_path / "not-a-repo").mkdir()
+        manifest = tmp_path / REPO_MANIFEST_FILENAME
+        manifest.write_text("gr01-old\ngr03-removed\n")
+
+        write_repo_manifest(tmp_path, [tmp_path / "gr02-new", tmp_path / "failed"])
+
+        assert manifest.read_text().splitlines() == ["gr01-old", "gr02-new", "by-hand"]
+        assert not (tmp_path / ".repo_manifest.tmp").exists()
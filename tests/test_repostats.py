@@ -1,9 +1,9 @@
 import os
+import re
 import shutil
-import tempfile
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any, Generator
+from typing import Any
 
 import git
 import pytest
@@ -17,39 +17,39 @@ from src.repo_stats import (
     RecentActivity,
     RepoReport,
     RepoStats,
+    count_chunked_text_lines,
+    count_text_lines,
     parse_byte_message,
 )
 
 
 class TestRepoStats:
-    @pytest.fixture
-    def temp_git_repo(self) -> Generator[str, Any, None]:
-        """Create a temporary Git repository for testing."""
-        # Create a temporary directory
-        temp_dir = tempfile.mkdtemp()
+    @pytest.fixture(scope="session")
+    def master_git_repo(self, tmp_path_factory: pytest.TempPathFactory) -> str:
+        """Create the Git repository copied by temp_git_repo, once per session."""
+        # Create a temporary directory, removed by pytest
+        temp_dir = str(tmp_path_factory.mktemp("repo"))
 
         # Initialize a Git repository
         repo = git.Repo.init(temp_dir)
+        # Committed through the index API, without a git process per commit
+        actor = git.Actor("Test User", "test@example.com")
 
         # Create a test file
         test_file = os.path.join(temp_dir, "test.py")
-        with open(test_file, "w") as f:
-            f.write("print('Hello, World!')\n")
+        Path(test_file).write_bytes(b"print('Hello, World!')\n")
 
         # Add test file to repository
-        repo.git.add(test_file)
-        repo.git.config("user.email", "test@example.com")
-        repo.git.config("user.name", "Test User")
-        repo.git.commit("-m", "Initial commit")
+        repo.index.add([test_file])
+        repo.index.commit("Initial commit", author=actor, committer=actor)
 
         # Create a second file
         test_file2 = os.path.join(temp_dir, "test2.txt")
-        with open(test_file2, "w") as f:
-            f.write("This is a test file.\n")
+        Path(test_file2).write_bytes(b"This is a test file.\n")
 
         # Add second file to repository
-        repo.git.add(test_file2)
-        repo.git.commit("-m", "Add second file")
+        repo.index.add([test_file2])
+        repo.index.commit("Add second file", author=actor, committer=actor)
 
         # Create a subdirectory
         subdir = os.path.join(temp_dir, "subdir")
@@ -57,17 +57,36 @@ class TestRepoStats:
 
         # Create a file in the subdirectory
         subdir_file = os.path.join(subdir, "subfile.md")
-        with open(subdir_file, "w") as f:
-            f.write("# Markdown File\n\nThis is a test markdown file.\n")
+        Path(subdir_file).write_bytes(
+            b"# Markdown File\n\nThis is a test markdown file.\n"
+        )
 
         # Add subdirectory file to repository
-        repo.git.add(subdir_file)
-        repo.git.commit("-m", "Add subdirectory file")
+        repo.index.add([subdir_file])
+        repo.index.commit("Add subdirectory file", author=actor, committer=actor)
+
+        # History walks read commit parents and dates from the commit-graph file
+        repo.git.commit_graph("write", "--reachable")
 
-        yield temp_dir
+        return temp_dir
 
-        # Clean up temporary directory after test
-        shutil.rmtree(temp_dir)
+    @pytest.fixture
+    def temp_git_repo(self, master_git_repo: str, tmp_path: Path) -> str:
+        """Copy the session repository, so tests may modify it independently."""
+        temp_dir = str(tmp_path / "repo")
+        shutil.copytree(master_git_repo, temp_dir, symlinks=True)
+        return temp_dir
+
+    @pytest.fixture(scope="session")
+    def repo_stats(self, master_git_repo: str) -> RepoStats:
+        """A RepoStats shared by the tests that only read the repository."""
+        return RepoStats(master_git_repo)
+
+    @pytest.fixture(scope="session")
+    def history_range(self, master_git_repo: str) -> tuple[datetime, datetime]:
+        """The last 30 days, up to just after the session repository commits."""
+        end_date = datetime.now(timezone.utc)
+        return end_date - timedelta(days=30), end_date
 
     def test_init(self, temp_git_repo: str) -> None:
         """Test the initialization of RepoStats."""
@@ -82,9 +101,8 @@ class TestRepoStats:
         with pytest.raises(ValueError):
             RepoStats("/tmp/nonexistent_repo")
 
-    def test_get_basic_stats(self, temp_git_repo: str) -> None:
+    def test_get_basic_stats(self, repo_stats: RepoStats) -> None:
         """Test getting basic statistics."""
-        repo_stats = RepoStats(temp_git_repo)
         basic_stats = repo_stats.get_basic_stats()
 
         assert isinstance(basic_stats, BasicStats)
@@ -94,29 +112,45 @@ class TestRepoStats:
         assert isinstance(basic_stats.last_commit, datetime)
         assert basic_stats.repo_size_mb > 0
 
-    def test_get_file_stats(self, temp_git_repo: str) -> None:
+    def test_get_file_stats(self, repo_stats: RepoStats) -> None:
         """Test getting file statistics."""
-        repo_stats = RepoStats(temp_git_repo)
         file_stats = repo_stats.get_file_stats()
 
         assert isinstance(file_stats, FileStats)
         assert file_stats.total_files == 3  # We created 3 files
         assert file_stats.total_lines > 0
-        assert ".py" in file_stats.file_types
-        assert ".txt" in file_stats.file_types
-        assert ".md" in file_stats.file_types
-        assert file_stats.file_types[".py"] == 1
-        assert file_stats.file_types[".txt"] == 1
-        assert file_stats.file_types[".md"] == 1
-
-    def test_get_commit_history(self, temp_git_repo: str) -> None:
-        """Test getting commit history."""
+        assert file_stats.file_types == {".py": 1, ".txt": 1, ".md": 1}
+
+    def test_stats_reused_until_head_moves(self, temp_git_repo: str) -> None:
+        """Test that basic and file stats are recomputed only for a new HEAD."""
         repo_stats = RepoStats(temp_git_repo)
+        file_stats = repo_stats.get_file_stats()
+        assert repo_stats.get_file_stats() is file_stats
 
-        # Define date range
-        end_date = datetime.now(timezone.utc)
-        start_date = end_date - timedelta(days=30)
+        Path(temp_git_repo, "test3.txt").write_text("Another file.\n")
+        repo_stats.repo.git.add("test3.txt")
+        repo_stats.repo.git.commit("-m", "Add third file")
+
+        assert repo_stats.get_file_stats().total_files == 4
+        assert repo_stats.get_basic_stats().total_commits == 4
+
+    def test_invalidate(self, temp_git_repo: str) -> None:
+        """Test that invalidate picks up working tree changes on the same HEAD."""
+        repo_stats = RepoStats(temp_git_repo)
+        total_lines = repo_stats.get_file_stats().total_lines
 
+        with open(os.path.join(temp_git_repo, "test.py"), "a") as f:
+            f.write("print('Again')\n")
+
+        assert repo_stats.get_file_stats().total_lines == total_lines
+        repo_stats.invalidate()
+        assert repo_stats.get_file_stats().total_lines == total_lines + 1
+
+    def test_get_commit_history(
+        self, repo_stats: RepoStats, history_range: tuple[datetime, datetime]
+    ) -> None:
+        """Test getting commit history."""
+        start_date, end_date = history_range
         commit_history = repo_stats.get_commit_history(start_date, end_date)
 
         assert isinstance(commit_history, list)
@@ -130,70 +164,231 @@ class TestRepoStats:
         assert "Add subdirectory file" in first_commit.message
         assert first_commit.files_changed == 1
 
-    def test_get_repo_size(self, temp_git_repo: str) -> None:
-        """Test getting repository size."""
+    def test_get_commit_history_multiline_message(self, temp_git_repo: str) -> None:
+        """Test commits with a message body and several changed files."""
+        repo = git.Repo(temp_git_repo)
+        Path(temp_git_repo, "test.py").write_text("print('Bye')\n")
+        Path(temp_git_repo, "subdir", "new.md").write_text("# New\n")
+        repo.git.add(A=True)
+        repo.git.commit("-m", "Update files\n\nSecond paragraph\nof the body")
+
+        end_date = datetime.now(timezone.utc)
+        commit_history = RepoStats(temp_git_repo).get_commit_history(
+            end_date - timedelta(days=30), end_date
+        )
+
+        assert len(commit_history) == 4
+        assert commit_history[0].message == (
+            "Update files\n\nSecond paragraph\nof the body\n"
+        )
+        assert commit_history[0].files_changed == 2
+        assert commit_history[1].files_changed == 1
+
+    def test_iter_commit_history(
+        self, repo_stats: RepoStats, history_range: tuple[datetime, datetime]
+    ) -> None:
+        """Test that commits are yielded one at a time, newest first."""
+        commits = repo_stats.iter_commit_history(*history_range)
+
+        first_commit = next(commits)
+        assert "Add subdirectory file" in first_commit.message
+        assert first_commit.files_changed == 1
+
+    def test_get_commit_history_without_file_counts(
+        self, repo_stats: RepoStats, history_range: tuple[datetime, datetime]
+    ) -> None:
+        """Test that files are not counted when file counts are not requested."""
+        commit_history = repo_stats.get_commit_history(
+            *history_range, include_file_counts=False
+        )
+
+        assert len(commit_history) == 3
+        assert "Add subdirectory file" in commit_history[0].message
+        assert all(entry.files_changed == 0 for entry in commit_history)
+
+    def test_get_commit_history_date_range(self, repo_stats: RepoStats) -> None:
+        """Test that only commits inside the date range are returned."""
+        now = datetime.now(timezone.utc)
+
+        past = repo_stats.get_commit_history(
+            now - timedelta(days=60), now - timedelta(days=30)
+        )
+        future = repo_stats.get_commit_history(
+            now + timedelta(days=1), now + timedelta(days=30)
+        )
+
+        assert past == []
+        assert future == []
+
+    def test_get_commit_history_keeps_last_range(
+        self, temp_git_repo: str, history_range: tuple[datetime, datetime]
+    ) -> None:
+        """Test that only the last commit history range stays memoized."""
+        repo_stats = RepoStats(temp_git_repo)
+        start_date, end_date = history_range
+
+        for days in range(5):
+            repo_stats.get_commit_history(start_date - timedelta(days=days), end_date)
+
+        history_keys = [k for k in repo_stats._memo if k.startswith("commit_history:")]
+        assert len(history_keys) == 1
+        assert len(repo_stats.get_commit_history(start_date, end_date)) == 3
+
+    def test_get_commit_history_end_day(self, temp_git_repo: str) -> None:
+        """Test that end_date is inclusive, down to the second."""
+        repo = git.Repo(temp_git_repo)
+        actor = git.Actor("Test User", "test@example.com")
+        Path(temp_git_repo, "test2.txt").write_bytes(b"Changed on the end day.\n")
+        repo.index.add(["test2.txt"])
+        commit_date = datetime(2024, 1, 10, 12, tzinfo=timezone.utc)
+        repo.index.commit(
+            "Commit on the end day",
+            author=actor,
+            committer=actor,
+            author_date=commit_date,
+            commit_date=commit_date,
+        )
         repo_stats = RepoStats(temp_git_repo)
+        start_date = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+        def messages(end_date: datetime) -> list[str]:
+            history = repo_stats.get_commit_history(start_date, end_date)
+            return [commit.message for commit in history]
+
+        assert messages(datetime(2024, 1, 10, 12, tzinfo=timezone.utc)) == [
+            "Commit on the end day"
+        ]
+        assert messages(datetime(2024, 1, 10, 23, 59, 59, tzinfo=timezone.utc)) == [
+            "Commit on the end day"
+        ]
+        assert messages(datetime(2024, 1, 10, 11, 59, 59, tzinfo=timezone.utc)) == []
+
+    def test_get_repo_size(self, repo_stats: RepoStats) -> None:
+        """Test getting repository size."""
         repo_size = repo_stats._get_repo_size()
 
         assert isinstance(repo_size, float)
         assert repo_size > 0
 
-    def test_get_file_structure(self, temp_git_repo: str) -> None:
-        """Test getting file structure."""
-        fs = FileStructureAnalyzer(temp_git_repo)
+    @pytest.mark.parametrize(
+        "kwargs, has_py_file, subdir",
+        [
+            # Unlimited depth: the subdirectory is listed
+            ({}, True, {"subfile.md": "subfile.md"}),
+            # At depth 0, we should only see the files in the root directory,
+            # and directories should be marked with "..."
+            ({"max_depth": 0}, True, TreeSignal.END),
+            # The .py file should be excluded
+            ({"exclude_patterns": [".*\\.py$"]}, False, {"subfile.md": "subfile.md"}),
+        ],
+        ids=["unlimited", "depth", "exclude"],
+    )
+    def test_get_file_structure(
+        self,
+        master_git_repo: str,
+        kwargs: dict[str, Any],
+        has_py_file: bool,
+        subdir: FileStructureAnalyzer.TreeObject,
+    ) -> None:
+        """Test getting file structure, with depth limit or exclude patterns."""
+        fs = FileStructureAnalyzer(master_git_repo, **kwargs)
         file_structure = fs.get_file_structure()
 
-        repo_name = Path(temp_git_repo).name
+        repo_name = Path(master_git_repo).name
         assert isinstance(file_structure, dict)
         assert repo_name in file_structure
 
         # Check that the files we created are in the structure
         repo_contents = file_structure[repo_name]
-        assert "test.py" in repo_contents
+        assert ("test.py" in repo_contents) is has_py_file
         assert "test2.txt" in repo_contents
-        assert "subdir" in repo_contents
-        assert "subfile.md" in repo_contents["subdir"]  # type: ignore
+        assert repo_contents["subdir"] == subdir  # type: ignore
 
-    def test_get_file_structure_with_depth(self, temp_git_repo: str) -> None:
-        """Test getting file structure with depth limit."""
-        fs = FileStructureAnalyzer(temp_git_repo, max_depth=0)
+    def test_get_file_structure_with_compiled_exclude(self, temp_git_repo: str) -> None:
+        """Test getting file structure with precompiled exclude patterns."""
+        fs = FileStructureAnalyzer(
+            temp_git_repo, exclude_patterns=[re.compile(".*\\.py$"), "subdir"]
+        )
         file_structure = fs.get_file_structure()
 
-        repo_name = Path(temp_git_repo).name
-        assert isinstance(file_structure, dict)
-        assert repo_name in file_structure
-
-        # At depth 0, we should only see the files in the root directory,
-        # and directories should be marked with "..."
-        repo_contents = file_structure[repo_name]
-        assert "test.py" in repo_contents
+        repo_contents = file_structure[Path(temp_git_repo).name]
+        assert "test.py" not in repo_contents
+        assert "subdir" not in repo_contents
         assert "test2.txt" in repo_contents
-        assert "subdir" in repo_contents
-        assert repo_contents["subdir"] == TreeSignal.END  # type: ignore
-
-    def test_get_file_structure_with_exclude(self, temp_git_repo: str) -> None:
-        """Test getting file structure with exclude patterns."""
-        fs = FileStructureAnalyzer(temp_git_repo, exclude_patterns=[".*\\.py$"])
+        assert fs.exclude_patterns == [".*\\.py$", "subdir"]
+        assert fs.exclude_regex is not None
+
+    def test_get_file_structure_with_mixed_flag_excludes(
+        self, temp_git_repo: str
+    ) -> None:
+        """Test exclude patterns with different flags, which can't be combined."""
+        fs = FileStructureAnalyzer(
+            temp_git_repo,
+            exclude_patterns=[re.compile("TEST2", re.IGNORECASE), "subfile"],
+        )
+        assert fs.exclude_regex is None
         file_structure = fs.get_file_structure()
 
-        repo_name = Path(temp_git_repo).name
-        assert isinstance(file_structure, dict)
-        assert repo_name in file_structure
+        repo_contents = file_structure[Path(temp_git_repo).name]
+        assert "test2.txt" not in repo_contents
+        assert "test.py" in repo_contents
+        assert repo_contents["subdir"] == {}  # type: ignore
+
+    def test_get_file_structure_symlinked_root(
+        self, master_git_repo: str, tmp_path: Path
+    ) -> None:
+        """Test that a symlink to the repository is listed as a directory."""
+        link = tmp_path / "link"
+        link.symlink_to(master_git_repo, target_is_directory=True)
+        file_structure = FileStructureAnalyzer(str(link)).get_file_structure()
+
+        repo_contents = file_structure["link"]
+        assert isinstance(repo_contents, dict)
+        assert "test.py" in repo_contents
 
-        # The .py file should be excluded
-        repo_contents = file_structure[repo_name]
-        assert "test.py" not in repo_contents
-        assert "test2.txt" in repo_contents
-        assert "subdir" in repo_contents
+    def test_raw_json_keeps_non_ascii_names(self, temp_git_repo: str) -> None:
+        """Test that both raw JSON views keep non-ASCII file names as is."""
+        Path(temp_git_repo, "résumé.md").write_text("")
+        tree, raw_json, tree_view = FileStructureAnalyzer(
+            temp_git_repo
+        ).get_formated_tree()
+        file_structure = FileStructure(
+            structure=tree,
+            structure_formated=tree_view,
+            excluded_patterns=[],
+            max_depth=None,
+        )
 
-    def test_generate_report(self, temp_git_repo: str) -> None:
+        assert '"résumé.md"' in raw_json
+        assert file_structure.structure_raw_json == raw_json
+
+    @pytest.mark.parametrize(
+        "patterns, excluded, kept",
+        [
+            # Reused group name: can't be in one alternation
+            (["(?P<n>foo)", "(?P<n>bar)"], ["/x/foo.py", "/x/bar.py"], ["/x/baz.py"]),
+            # Global inline flag, only valid at the start of the whole regex
+            (["subdir", "(?i)readme"], ["/x/README.md", "/x/subdir"], ["/x/a.md"]),
+            # Backreference, which would be renumbered in an alternation
+            (["(b)", r"(a)\1"], ["/x/aa", "/x/b"], ["/x/a"]),
+        ],
+        ids=["group_name", "inline_flag", "backreference"],
+    )
+    def test_should_exclude_uncombinable_patterns(
+        self, patterns: list[str], excluded: list[str], kept: list[str]
+    ) -> None:
+        """Test patterns that are matched one by one instead of combined."""
+        fs = FileStructureAnalyzer("/x", exclude_patterns=patterns)
+        assert fs.uncombined_patterns
+
+        assert all(fs.should_exclude(path) for path in excluded)
+        assert not any(fs.should_exclude(path) for path in kept)
+
+    def test_generate_report(
+        self, repo_stats: RepoStats, history_range: tuple[datetime, datetime]
+    ) -> None:
         """Test generating a complete report."""
-        repo_stats = RepoStats(temp_git_repo)
-
-        # Define date range
-        end_date = datetime.now(timezone.utc)
-        start_date = end_date - timedelta(days=30)
-
+        start_date, end_date = history_range
         report = repo_stats.generate_report(
             start_date=start_date,
             end_date=end_date,
@@ -202,23 +397,90 @@ class TestRepoStats:
         )
 
         assert isinstance(report, RepoReport)
-        assert report.repository == Path(temp_git_repo).name
+        assert report.repository == repo_stats.repo_name
         assert isinstance(report.basic_stats, BasicStats)
         assert isinstance(report.file_stats, FileStats)
         assert isinstance(report.recent_activity, RecentActivity)
         assert isinstance(report.commit_history, list)
         assert isinstance(report.file_structure, FileStructure)
 
+        # Check that the columnar commit history matches the entries
+        columns = report.commit_history_columns
+        assert len(columns["date"]) == len(report.commit_history)
+        assert columns["date"].dtype == "datetime64[ns]"
+        assert columns["files_changed"].dtype == "int32"
+        assert list(columns["message"]) == [c.message for c in report.commit_history]
+
         # Check that the file structure is correct
         assert report.file_structure.max_depth == 1
         assert report.file_structure.excluded_patterns == [".*\\.py$"]
 
         # Check that the .py file is excluded
-        repo_contents = report.file_structure.structure[Path(temp_git_repo).name]
+        repo_contents = report.file_structure.structure[repo_stats.repo_name]
         assert "test.py" not in repo_contents
         assert "test2.txt" in repo_contents
         assert "subdir" in repo_contents
 
+    @pytest.mark.parametrize(
+        "content, expected",
+        [
+            (b"", 0),
+            (b"a\nb\n", 2),
+            # last line without a line end
+            (b"a\nb", 2),
+            (b"a\r\nb\r\n", 2),
+            # a lone "\r" ends a line, as in universal newlines mode
+            (b"a\rb\r", 2),
+            (b"a\r\n\rb", 3),
+            (b"\n\n", 2),
+            # invalid UTF-8: counted as a binary file
+            (b"\x80\x81\x82\x83", 0),
+            (b"text\n\xff\n", 0),
+        ],
+    )
+    def test_count_text_lines(self, content: bytes, expected: int) -> None:
+        """Test line counting rules, against Python's universal newlines."""
+        assert count_text_lines(content) == expected
+        if expected:
+            assert len(content.decode("utf-8").splitlines()) == expected
+
+    @pytest.mark.parametrize(
+        "chunks, expected",
+        [
+            # "\r\n" split over two chunks is one line end
+            ([b"a\r", b"\nb\r\n"], 2),
+            # a lone "\r" at the end of a chunk
+            ([b"a\r", b"b"], 2),
+            # a UTF-8 character split over two chunks is valid
+            ([b"caf\xc3", b"\xa9\n"], 1),
+            # invalid UTF-8 in a later chunk still makes the file binary
+            ([b"text\n", b"\x80\n"], 0),
+            # truncated UTF-8 character at the end of the file
+            ([b"text\n\xc3"], 0),
+            ([b"", b"a\n", b""], 1),
+        ],
+        ids=[
+            "split_crlf",
+            "split_cr",
+            "split_char",
+            "late_binary",
+            "truncated",
+            "empty",
+        ],
+    )
+    def test_count_chunked_text_lines(self, chunks: list[bytes], expected: int) -> None:
+        """Test counting lines over chunk boundaries."""
+        assert count_chunked_text_lines(chunks) == expected
+
+    def test_get_file_stats_small_chunks(
+        self, repo_stats: RepoStats, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that reading files by chunks doesn't change the line count."""
+        total_lines = repo_stats._compute_file_stats().total_lines
+        monkeypatch.setattr("src.repo_stats.LINE_COUNT_CHUNK_SIZE", 3)
+
+        assert repo_stats._compute_file_stats().total_lines == total_lines
+
     def test_parse_byte_message(self) -> None:
         """Test parsing byte messages."""
 
@@ -1,5 +1,3 @@
-from enum import Enum
-
 from src.file_structure import TreeSignal
 
 
@@ -11,8 +9,11 @@ def test_tree_signal_is_str():
 
 def test_tree_signal_has_unique_values():
     """Ensure all enum values are unique."""
-    values = [signal.value for signal in TreeSignal]
-    assert len(values) == len(set(values)), "Enum values are not unique"
+    seen = set()
+    # __members__ includes aliases, which iterating over TreeSignal skips
+    for name, signal in TreeSignal.__members__.items():
+        assert signal.value not in seen, f"{name} duplicates value {signal.value!r}"
+        seen.add(signal.value)
 
 
 def test_tree_signal_integrity():
@@ -21,6 +22,6 @@ def test_tree_signal_integrity():
     assert hasattr(TreeSignal, "END"), "END is missing from TreeSignal"
     assert hasattr(TreeSignal, "EXCLUDE"), "EXCLUDE is missing from TreeSignal"
 
-    assert TreeSignal.STOP != TreeSignal.END != TreeSignal.EXCLUDE, (
-        "Enum values should be different"
-    )
+    # a chained != would not compare STOP with EXCLUDE
+    signals = {TreeSignal.STOP, TreeSignal.END, TreeSignal.EXCLUDE}
+    assert len(signals) == 3, "Enum values should be different"